@@ -0,0 +1,12 @@
+"""Performance benchmarks for sbol2.
+
+The suites follow the asv conventions: time_* methods are timed and
+peakmem_* methods report peak memory, for each value in params.
+Run them with asv (see asv.conf.json at the top of the repository):
+
+    asv run
+
+or, without asv installed, with the bundled runner:
+
+    python -m benchmarks.run --max-size 10000
+"""
@@ -0,0 +1,104 @@
+"""Benchmarks for assembling and compiling designs."""
+from .common import (PART_COUNTS, make_combinatorial_library, make_design,
+                     make_hierarchy)
+
+
+class Assembly:
+    """Assemble parts into a linear primary structure."""
+    params = PART_COUNTS
+    param_names = ['parts']
+    timeout = 600
+    # Assembly modifies the design, so every sample needs a fresh setup
+    number = 1
+    warmup_time = 0
+
+    def setup(self, part_count):
+        self.design, self.parts = make_design(part_count)
+
+    def time_assemble_primary_structure(self, part_count):
+        self.design.assemblePrimaryStructure(self.parts)
+
+    def peakmem_assemble_primary_structure(self, part_count):
+        self.design.assemblePrimaryStructure(self.parts)
+
+
+class AssembleMany:
+    """Assemble a combinatorial library of designs, each of six of a
+    hundred parts, with Document.assemble_many."""
+    params = [100, 1000]
+    param_names = ['designs']
+    timeout = 600
+    number = 1
+    warmup_time = 0
+
+    def setup(self, design_count):
+        design, parts = make_design(100)
+        self.doc = design.doc
+        self.designs = {'design%d' % i: [parts[(i * 7 + j * 13) % 100].displayId
+                                         for j in range(6)]
+                        for i in range(design_count)}
+
+    def time_assemble_many(self, design_count):
+        self.doc.assemble_many(self.designs)
+
+
+class PrimaryStructure:
+    """Order the Components of an assembled design."""
+    params = PART_COUNTS
+    param_names = ['parts']
+    timeout = 600
+
+    def setup(self, part_count):
+        self.design, self.parts = make_design(part_count)
+        self.design.assemblePrimaryStructure(self.parts)
+
+    def time_get_primary_structure_components(self, part_count):
+        self.design.getPrimaryStructureComponents()
+
+
+class Compile:
+    """Compile the sequence of an assembled design."""
+    params = PART_COUNTS
+    param_names = ['parts']
+    timeout = 600
+
+    def setup(self, part_count):
+        self.design, self.parts = make_design(part_count)
+        self.design.assemblePrimaryStructure(self.parts)
+
+    def time_compile(self, part_count):
+        self.design.compile()
+
+    def peakmem_compile(self, part_count):
+        self.design.compile()
+
+
+class CompileHierarchy:
+    """Compile the sequence of a deeply nested design, 5 Mb at the top."""
+    params = [10, 100]
+    param_names = ['depth']
+    timeout = 600
+    # Compiling adds SequenceAnnotations, so start from a fresh design
+    number = 1
+    warmup_time = 0
+
+    def setup(self, depth):
+        self.design = make_hierarchy(depth, 5000000 // (2 * depth))
+
+    def time_compile(self, depth):
+        self.design.compile()
+
+
+class CompileLibrary:
+    """Compile every design of a combinatorial library."""
+    params = [10, 100]
+    param_names = ['designs']
+    timeout = 600
+    number = 1
+    warmup_time = 0
+
+    def setup(self, design_count):
+        self.doc = make_combinatorial_library(design_count)
+
+    def time_compile_all(self, design_count):
+        self.doc.compile_all()
@@ -0,0 +1,219 @@
+"""Benchmarks for reading, writing and searching Documents."""
+import os
+import tempfile
+
+import sbol2
+
+from .common import (HOMESPACE, RESOURCES, SIZES, configure, make_document,
+                     resource_files, write_documents, write_library)
+
+
+class ReadSynthetic:
+    """Read synthetic documents from disk."""
+    params = SIZES
+    param_names = ['objects']
+    timeout = 1800
+
+    def setup_cache(self):
+        # asv runs setup_cache in a directory it removes afterwards
+        directory = os.getcwd()
+        return write_documents(directory, self.params)
+
+    def setup(self, paths, size):
+        configure()
+
+    def time_read(self, paths, size):
+        sbol2.Document().read(paths[size])
+
+    def peakmem_read(self, paths, size):
+        sbol2.Document().read(paths[size])
+
+    def time_read_streaming(self, paths, size):
+        sbol2.Document().read(paths[size], streaming=True)
+
+    def peakmem_read_streaming(self, paths, size):
+        sbol2.Document().read(paths[size], streaming=True)
+
+    def time_read_lazy_first_lookup(self, paths, size):
+        doc = sbol2.Document()
+        doc.read(paths[size], lazy=True)
+        doc.getComponentDefinition(HOMESPACE + '/cd0/1')
+
+    def peakmem_read_lazy_first_lookup(self, paths, size):
+        doc = sbol2.Document()
+        doc.read(paths[size], lazy=True)
+        doc.getComponentDefinition(HOMESPACE + '/cd0/1')
+
+    def time_read_lazy_streaming_first_lookup(self, paths, size):
+        doc = sbol2.Document()
+        doc.read(paths[size], lazy=True, streaming=True)
+        doc.getComponentDefinition(HOMESPACE + '/cd0/1')
+
+
+class Append:
+    """Merge a library of 100 files of 200 objects into one Document,
+    one file at a time."""
+    timeout = 1800
+
+    def setup_cache(self):
+        directory = os.getcwd()
+        return write_library(directory, 100, 200)
+
+    def setup(self, paths):
+        configure()
+
+    def time_append(self, paths):
+        doc = sbol2.Document()
+        for path in paths:
+            doc.append(path, streaming=True)
+
+
+class AppendMany:
+    """Merge the same library with Document.append_many."""
+    params = [1, 2, 4]
+    param_names = ['workers']
+    timeout = 1800
+
+    def setup_cache(self):
+        directory = os.getcwd()
+        return write_library(directory, 100, 200)
+
+    def setup(self, paths, workers):
+        configure()
+
+    def time_append_many(self, paths, workers):
+        sbol2.Document().append_many(paths, workers=workers)
+
+
+class ReadFixtures:
+    """Read the SBOL files in test/resources."""
+    params = resource_files()
+    param_names = ['file']
+
+    def setup(self, name):
+        configure()
+        self.path = os.path.join(RESOURCES, name)
+
+    def time_read(self, name):
+        sbol2.Document().read(self.path)
+
+    def peakmem_read(self, name):
+        sbol2.Document().read(self.path)
+
+
+class Write:
+    """Serialize synthetic documents."""
+    params = SIZES
+    param_names = ['objects']
+    timeout = 1800
+
+    def setup(self, size):
+        self.doc = make_document(size)
+
+    def time_write_string(self, size):
+        # update_graph() is incremental, so force the full rebuild
+        # that a first write of a Document pays
+        self.doc.update_graph(rebuild=True)
+        self.doc.writeString()
+
+    def peakmem_write_string(self, size):
+        self.doc.update_graph(rebuild=True)
+        self.doc.writeString()
+
+    def time_write_streaming(self, size):
+        with tempfile.TemporaryDirectory() as directory:
+            self.doc.write(os.path.join(directory, 'out.xml'), streaming=True)
+
+
+class WriteNamespaces:
+    """Serialize a synthetic document of 10000 objects that declares
+    many unused extension namespaces."""
+    params = [0, 100, 1000]
+    param_names = ['namespaces']
+    timeout = 1800
+
+    def setup(self, count):
+        self.doc = make_document(10000)
+        for i in range(count):
+            self.doc.addNamespace('http://examples.org/extension%d#' % i,
+                                  'ext%d' % i)
+
+    def time_write_string(self, count):
+        self.doc.update_graph(rebuild=True)
+        self.doc.writeString()
+
+    def time_write_streaming(self, count):
+        with tempfile.TemporaryDirectory() as directory:
+            self.doc.write(os.path.join(directory, 'out.xml'), streaming=True)
+
+
+class Compare:
+    """Compare and diff two equal synthetic documents."""
+    params = SIZES
+    param_names = ['objects']
+    timeout = 1800
+
+    def setup(self, size):
+        self.doc = make_document(size)
+        self.doc2 = make_document(size)
+
+    def time_compare(self, size):
+        self.doc.compare(self.doc2)
+
+    def time_compare_after_change(self, size):
+        self.doc.compare(self.doc2)
+        self.doc.componentDefinitions[0].name = 'changed'
+        self.doc.compare(self.doc2)
+
+    def time_diff(self, size):
+        self.doc.diff(self.doc2)
+
+
+class Patch:
+    """Diff two synthetic documents in which one ComponentDefinition
+    in a hundred differs, and apply the changes."""
+    params = SIZES
+    param_names = ['objects']
+    timeout = 1800
+
+    def setup(self, size):
+        self.doc = make_document(size)
+        self.doc2 = make_document(size)
+        for cd in list(self.doc2.componentDefinitions)[::50]:
+            cd.name = 'changed'
+        self.diff = self.doc.diff(self.doc2)
+
+    def time_diff(self, size):
+        self.doc.diff(self.doc2)
+
+    def time_apply_patch(self, size):
+        # The patch only changes objects, so it can be applied again
+        self.doc.apply_patch(self.diff)
+
+
+class Lookup:
+    """Look up every tenth ComponentDefinition in a synthetic document."""
+    params = SIZES
+    param_names = ['objects']
+    timeout = 1800
+
+    def setup(self, size):
+        self.doc = make_document(size)
+        cds = self.doc.componentDefinitions
+        self.identities = [cd.identity for cd in cds][::10]
+        self.display_ids = [cd.displayId for cd in cds][::10]
+
+    def time_find(self, size):
+        find = self.doc.find
+        for identity in self.identities:
+            find(identity)
+
+    def time_get_uri_identity(self, size):
+        cds = self.doc.componentDefinitions
+        for identity in self.identities:
+            cds.get_uri(identity)
+
+    def time_get_uri_display_id(self, size):
+        cds = self.doc.componentDefinitions
+        for display_id in self.display_ids:
+            cds.get_uri(display_id)
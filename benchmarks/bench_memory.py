@@ -0,0 +1,31 @@
+"""Benchmarks for the memory held by individual SBOL objects."""
+import tracemalloc
+
+import sbol2
+
+from .common import configure
+
+# Objects built per measurement
+COUNT = 2000
+
+
+class ObjectSize:
+    """Bytes allocated per object by the constructor of each class."""
+    params = ['ComponentDefinition', 'Sequence', 'SequenceAnnotation', 'Range',
+              'Component', 'ModuleDefinition']
+    param_names = ['class']
+    unit = 'bytes'
+
+    def setup(self, class_name):
+        configure()
+        self.cls = getattr(sbol2, class_name)
+        # Warm up any caches so they are not counted
+        [self.cls('warmup%d' % i) for i in range(10)]
+
+    def track_bytes_per_object(self, class_name):
+        tracemalloc.start()
+        objects = [self.cls('obj%d' % i) for i in range(COUNT)]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del objects
+        return size // COUNT
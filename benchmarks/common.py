@@ -0,0 +1,131 @@
+"""Synthetic documents and fixtures shared by the benchmarks."""
+import glob
+import os
+
+import sbol2
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESOURCES = os.path.join(ROOT, 'test', 'resources')
+
+# Number of objects in the synthetic documents
+SIZES = [1000, 10000, 100000]
+
+# Number of parts in the synthetic designs
+PART_COUNTS = [10, 100, 1000]
+
+HOMESPACE = 'http://examples.org/benchmark'
+
+
+def configure():
+    """Put the library in the configuration the benchmarks assume."""
+    sbol2.setHomespace(HOMESPACE)
+    sbol2.Config.setOption(sbol2.ConfigOptions.SBOL_COMPLIANT_URIS, True)
+    sbol2.Config.setOption(sbol2.ConfigOptions.SBOL_TYPED_URIS, False)
+    sbol2.Config.setOption(sbol2.ConfigOptions.VALIDATE, False)
+
+
+def resource_files():
+    """Return the names of the SBOL files in test/resources."""
+    paths = glob.glob(os.path.join(RESOURCES, '**', '*.xml'), recursive=True)
+    return sorted(os.path.relpath(p, RESOURCES) for p in paths)
+
+
+def make_document(size, prefix=''):
+    """Build a Document holding size objects: ComponentDefinitions,
+    each referencing its own Sequence. prefix is put in front of every
+    displayId."""
+    configure()
+    doc = sbol2.Document()
+    objects = []
+    for i in range(size // 2):
+        cd = sbol2.ComponentDefinition('%scd%d' % (prefix, i))
+        seq = sbol2.Sequence('%scd%d_seq' % (prefix, i), 'atgc' * 10)
+        cd.sequences = [seq.identity]
+        objects += [cd, seq]
+    doc.add_list(objects)
+    return doc
+
+
+def write_documents(directory, sizes=SIZES):
+    """Write a synthetic document of each size to directory and return
+    a dict mapping size to path."""
+    paths = {}
+    for size in sizes:
+        path = os.path.join(directory, 'synthetic_%d.xml' % size)
+        make_document(size).write(path)
+        paths[size] = path
+    return paths
+
+
+def make_design(part_count):
+    """Build a Document with part_count parts, each with a Sequence,
+    and an empty design ComponentDefinition to assemble them into.
+    Returns the design and the parts."""
+    configure()
+    doc = sbol2.Document()
+    parts = []
+    for i in range(part_count):
+        part = doc.componentDefinitions.create('part%d' % i)
+        part.sequence = sbol2.Sequence('part%d_seq' % i, 'atgc' * 25)
+        parts.append(part)
+    design = doc.componentDefinitions.create('design')
+    return design, parts
+
+
+def make_hierarchy(depth, part_length):
+    """Build a Document with a design nested depth levels deep. Each
+    level assembles two parts of part_length bases around the level
+    below it. Returns the top level design."""
+    configure()
+    doc = sbol2.Document()
+    below = None
+    for level in range(depth):
+        parts = []
+        for i in range(2):
+            part = doc.componentDefinitions.create('part%d_%d' % (level, i))
+            part.sequence = sbol2.Sequence('part%d_%d_seq' % (level, i),
+                                           'atgc' * (part_length // 4))
+            parts.append(part)
+        if below is not None:
+            parts.insert(1, below)
+        design = doc.componentDefinitions.create('level%d' % level)
+        design.sequence = sbol2.Sequence('level%d_seq' % level)
+        design.assemblePrimaryStructure(parts)
+        below = design
+    return below
+
+
+def make_combinatorial_library(design_count):
+    """Build a Document with design_count designs, each assembling
+    four of ten shared subassemblies of ten parts. Returns the
+    Document."""
+    configure()
+    doc = sbol2.Document()
+    parts = []
+    for i in range(100):
+        part = doc.componentDefinitions.create('part%d' % i)
+        part.sequence = sbol2.Sequence('part%d_seq' % i, 'atgc' * 250)
+        parts.append(part)
+    subassemblies = []
+    for i in range(10):
+        sub = doc.componentDefinitions.create('sub%d' % i)
+        sub.sequence = sbol2.Sequence('sub%d_seq' % i)
+        sub.assemblePrimaryStructure(parts[10 * i:10 * i + 10])
+        subassemblies.append(sub)
+    for i in range(design_count):
+        design = doc.componentDefinitions.create('design%d' % i)
+        design.sequence = sbol2.Sequence('design%d_seq' % i)
+        design.assemblePrimaryStructure([subassemblies[(i + j) % 10]
+                                         for j in range(0, 8, 2)])
+    return doc
+
+
+def write_library(directory, file_count, size):
+    """Write file_count synthetic documents of size objects each, with
+    no identities in common, to directory and return their paths."""
+    paths = []
+    for i in range(file_count):
+        path = os.path.join(directory, 'library_%d.xml' % i)
+        make_document(size, prefix='lib%d_' % i).write(path)
+        paths.append(path)
+    return paths
@@ -0,0 +1,102 @@
+"""Run the benchmarks without asv.
+
+Reports, for every benchmark and parameter, the best wall time of the
+time_* methods, the peak traced allocation of the peakmem_* methods and
+the value returned by the track_* methods.
+
+Usage: python -m benchmarks.run [--max-size N] [--repeat N] [filter]
+"""
+import argparse
+import importlib
+import inspect
+import os
+import pkgutil
+import tempfile
+import time
+import tracemalloc
+
+import benchmarks
+
+
+def suites(name_filter):
+    for module_info in pkgutil.iter_modules(benchmarks.__path__):
+        if not module_info.name.startswith('bench_'):
+            continue
+        module = importlib.import_module('benchmarks.' + module_info.name)
+        for _, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            methods = [name for name in dir(cls)
+                       if name.startswith(('time_', 'peakmem_', 'track_'))]
+            methods = [name for name in methods
+                       if name_filter in '%s.%s' % (cls.__name__, name)]
+            if methods:
+                yield cls, methods
+
+
+def measure(suite, method, args, repeat):
+    # Each sample gets a fresh setup, like asv with number = 1
+    best = None
+    for _ in range(repeat if method.startswith('time_') else 1):
+        if hasattr(suite, 'setup'):
+            suite.setup(*args)
+        func = getattr(suite, method)
+        if method.startswith('time_'):
+            start = time.perf_counter()
+            func(*args)
+            result = time.perf_counter() - start
+        elif method.startswith('peakmem_'):
+            tracemalloc.start()
+            func(*args)
+            result = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            result = func(*args)
+        best = result if best is None else min(best, result)
+    return best
+
+
+def run_suite(cls, suite, methods, params, directory, repeat):
+    # Like asv, run setup_cache in a directory that is removed afterwards
+    cache = []
+    if hasattr(suite, 'setup_cache'):
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            cache = [suite.setup_cache()]
+        finally:
+            os.chdir(cwd)
+    for param in params:
+        args = cache + ([] if param is None else [param])
+        for method in methods:
+            result = measure(suite, method, args, repeat)
+            if method.startswith('time_'):
+                report = '%12.6f s' % result
+            elif method.startswith('peakmem_'):
+                report = '%12.1f MiB' % (result / 2 ** 20)
+            else:
+                report = '%12s %s' % (result, getattr(cls, 'unit', ''))
+            print('%-45s %-20s %s' % ('%s.%s' % (cls.__name__, method),
+                                      param, report), flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-size', type=int, default=None,
+                        help='skip numeric parameters larger than this')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('filter', nargs='?', default='')
+    options = parser.parse_args()
+    for cls, methods in suites(options.filter):
+        params = list(getattr(cls, 'params', [None]))
+        if options.max_size is not None:
+            params = [p for p in params
+                      if not isinstance(p, int) or p <= options.max_size]
+        cls.params = params
+        suite = cls()
+        with tempfile.TemporaryDirectory() as directory:
+            run_suite(cls, suite, methods, params, directory, options.repeat)
+
+
+if __name__ == '__main__':
+    main()
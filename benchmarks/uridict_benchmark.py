@@ -0,0 +1,82 @@
+"""Compare URIDict with the collections.UserDict version it replaced.
+
+Times raw mapping operations with URIRef keys, then the time to read
+the SBOL files shipped with the tests using each implementation.
+
+Usage: python benchmarks/uridict_benchmark.py [repeat]
+"""
+import collections
+import glob
+import os
+import sys
+import timeit
+
+import rdflib
+
+import sbol2
+import sbol2.document
+import sbol2.object
+from sbol2.uridict import URIDict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_FILES = sorted(glob.glob(os.path.join(ROOT, 'test', 'resources', '**', '*.xml'),
+                              recursive=True) +
+                    glob.glob(os.path.join(ROOT, 'test', 'SBOLTestSuite', 'SBOL2',
+                                           '*.xml')))
+
+
+class UserDictURIDict(collections.UserDict):
+    # The implementation URIDict replaced
+
+    def __getitem__(self, key):
+        return super().__getitem__(str(key))
+
+    def __setitem__(self, key, value):
+        super().__setitem__(str(key), value)
+
+    def __delitem__(self, key):
+        super().__delitem__(str(key))
+
+    def __contains__(self, key):
+        return super().__contains__(str(key))
+
+
+def use(mapping_class):
+    sbol2.document.URIDict = mapping_class
+    sbol2.object.URIDict = mapping_class
+
+
+def mapping_ops(mapping_class, keys):
+    mapping = mapping_class()
+    for key in keys:
+        mapping[key] = []
+    for key in keys:
+        if key in mapping:
+            mapping[key].append(key)
+    for key in keys:
+        del mapping[key]
+
+
+def read_files():
+    for path in TEST_FILES:
+        sbol2.Document().read(path)
+
+
+def best(stmt, repeat):
+    return min(timeit.repeat(stmt, number=1, repeat=repeat))
+
+
+def main(repeat=5):
+    keys = [rdflib.URIRef('http://examples.org/cd%d/1' % i) for i in range(100000)]
+    print('%d files' % len(TEST_FILES))
+    print('%-16s %12s %12s' % ('', 'ops (s)', 'read (s)'))
+    for mapping_class in (UserDictURIDict, URIDict):
+        use(mapping_class)
+        ops = best(lambda: mapping_ops(mapping_class, keys), repeat)
+        read = best(read_files, repeat)
+        print('%-16s %12.4f %12.4f' % (mapping_class.__name__, ops, read))
+    use(URIDict)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -23,17 +23,36 @@
 #   OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF
 #   SUCH DAMAGE.
 from collections import defaultdict
+import os
+import pathlib
 from typing import Dict
+from urllib.parse import urljoin
 
 from lxml import etree
 from lxml.etree import tostring
 from lxml.etree import QName
 
 from rdflib.namespace import RDF
-from rdflib import URIRef, Literal
+from rdflib import BNode, URIRef, Literal
+
+from .constants import SBOL_IDENTITY
 
 rdfNS = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
 sbolNS = "http://sbols.org/v2#"
+xmlNS = "http://www.w3.org/XML/1998/namespace"
+
+RDF_RDF = '{%s}RDF' % rdfNS
+RDF_DESCRIPTION = '{%s}Description' % rdfNS
+RDF_ABOUT = '{%s}about' % rdfNS
+RDF_ID = '{%s}ID' % rdfNS
+RDF_NODE_ID = '{%s}nodeID' % rdfNS
+RDF_RESOURCE = '{%s}resource' % rdfNS
+RDF_DATATYPE = '{%s}datatype' % rdfNS
+RDF_PARSE_TYPE = '{%s}parseType' % rdfNS
+RDF_TYPE = '{%s}type' % rdfNS
+RDF_LI = '{%s}li' % rdfNS
+XML_LANG = '{%s}lang' % xmlNS
+XML_BASE = '{%s}base' % xmlNS
 
 # This is a module global that is used to register ownership relationships
 # between classes. The serializer uses this to generate structured XML from
@@ -63,36 +82,43 @@ def ns_prefix_dict(g):
     return {ns: prefix.toPython() for (ns, prefix) in g.namespaces()}
 
 
-def serialize_sboll2(g):
+def serialize_sboll2(g, canonical=False):
+    """Serialize a graph of SBOL triples to structured RDF/XML.
+
+    :param g: the rdflib Graph to serialize
+    :param canonical: if True, sort subjects, properties and namespace
+        declarations, so that equal graphs give equal bytes
+    :return: the RDF/XML as bytes
+    """
     prefixes = ns_prefix_dict(g)
     prefixes['rdf'] = rdfNS
     prefixes['sbol'] = sbolNS
+    type_triples = g.triples((None, RDF.type, None))
+    triples = g.triples((None, None, None))
+    if canonical:
+        prefixes = dict(sorted(prefixes.items()))
+        type_triples = sorted(type_triples, key=_triple_key)
+        triples = sorted(triples, key=_triple_key)
+    qname = _Prefixer(prefixes)
 
     subject_to_element = dict()
     subject_to_type = dict()
 
     owned_elements = set()
 
-    for triple in g.triples((None, RDF.type, None)):
+    for triple in type_triples:
         subject_to_type[triple[0]] = triple[2]
         subject = triple[0].toPython()
         the_type = triple[2].toPython()
         if subject in subject_to_element:
             etree.SubElement(subject_to_element[subject],
-                             prefixify(RDF.type, prefixes, True),
-                             attrib={
-                                 QName(rdfNS, 'resource'): the_type
-                             })
+                             qname(RDF.type),
+                             attrib={RDF_RESOURCE: the_type})
         else:
-            subject_to_element[subject] = etree.Element(prefixify(the_type, prefixes,
-                                                                  True),
-                                                        attrib={
-                                                            QName(rdfNS,
-                                                                  'about'): subject
-                                                        }
-                                                        )
-
-    for triple in g.triples((None, None, None)):
+            subject_to_element[subject] = etree.Element(qname(the_type),
+                                                        attrib={RDF_ABOUT: subject})
+
+    for triple in triples:
         if triple[1] == RDF.type:
             continue
         subject = triple[0].toPython()
@@ -101,21 +127,23 @@ def serialize_sboll2(g):
         element = subject_to_element[subject]
         if is_ownership_relation(triple, subject_to_type[triple[0]]):
             owned_element = subject_to_element[obj.toPython()]
-            ownership_element = etree.SubElement(element,
-                                                 prefixify(predicate, prefixes, True))
+            ownership_element = etree.SubElement(element, qname(predicate))
             ownership_element.append(owned_element)
             owned_elements.add(obj.toPython())
             continue
         if isinstance(obj, URIRef):
-            etree.SubElement(element, prefixify(predicate, prefixes, True), attrib={
-                QName(rdfNS, 'resource'): obj.toPython()
+            etree.SubElement(element, qname(predicate), attrib={
+                RDF_RESOURCE: obj.toPython()
             })
         elif isinstance(obj, Literal):
-            elem = etree.SubElement(element, prefixify(predicate, prefixes, True))
+            elem = etree.SubElement(element, qname(predicate))
             elem.text = obj
         else:
             raise Exception()
 
+    if canonical:
+        # New prefixes may have been made up along the way
+        prefixes = dict(sorted(prefixes.items()))
     doc = etree.Element(QName(rdfNS, 'RDF'), nsmap=prefixes)
 
     for subject in subject_to_element:
@@ -126,23 +154,471 @@ def serialize_sboll2(g):
     return tostring(doc, pretty_print=True)
 
 
+def write_sboll2(objects, namespaces, outfile, canonical=False):
+    """Serialize SBOL objects and their owned objects to an RDF/XML file
+    incrementally, without building an rdflib Graph or an element tree.
+
+    :param objects: the SBOLObjects to appear at the top of the document
+    :param namespaces: a dictionary of prefix, namespace pairs
+    :param outfile: a filename or a binary file-like object
+    :param canonical: if True, sort objects, properties and namespace
+        declarations, so that equal documents give equal bytes
+    :return: None
+    """
+    prefixes = {str(prefix): str(ns) for prefix, ns in namespaces.items()
+                if str(ns) != xmlNS}
+    prefixes['rdf'] = rdfNS
+    prefixes['sbol'] = sbolNS
+    if canonical:
+        prefixes = dict(sorted(prefixes.items()))
+        objects = sorted(objects, key=_identity_key)
+    # All namespaces are declared on the root element, so find the
+    # ones that are needed before writing anything.
+    qname = _Prefixer(prefixes)
+    tags = {RDF_ABOUT: 'rdf:about', RDF_RESOURCE: 'rdf:resource'}
+    for obj in objects:
+        _collect_tags(obj, qname, tags, canonical)
+    # lxml copies the namespace map of the enclosing element for every
+    # element it writes, so only the namespaces in use go in it. The
+    # others are declared as plain attributes.
+    if canonical:
+        prefixes = dict(sorted(prefixes.items()))
+    nsmap = {prefix: namespace for prefix, namespace in prefixes.items()
+             if not prefix or prefix == 'rdf' or prefix in qname.used}
+    declarations = {'xmlns:' + prefix: namespace
+                    for prefix, namespace in prefixes.items()
+                    if prefix not in nsmap}
+    with etree.xmlfile(outfile, encoding='utf-8') as xf:
+        with xf.element(QName(rdfNS, 'RDF'), declarations, nsmap=nsmap):
+            for obj in objects:
+                xf.write('\n  ')
+                _write_object(xf, obj, tags, 1, canonical)
+            xf.write('\n')
+
+
+def _collect_tags(obj, qname, tags, canonical):
+    # Map every type and predicate IRI used by obj to an XML tag. Any
+    # prefixes made up along the way are numbered in visiting order, so
+    # the canonical order is followed here too.
+    iris = [obj.rdf_type, *obj.properties.keys(), *obj.owned_objects.keys()]
+    owned_objects = obj.owned_objects.items()
+    if canonical:
+        iris.sort(key=str)
+        owned_objects = sorted(owned_objects, key=_first_key)
+    for iri in iris:
+        if iri not in tags:
+            tags[iri] = qname.prefixed_name(iri)
+    for rdf_type, object_store in owned_objects:
+        if rdf_type in obj._hidden_properties:
+            continue
+        if canonical:
+            object_store = sorted(object_store, key=_identity_key)
+        for child_obj in object_store:
+            _collect_tags(child_obj, qname, tags, canonical)
+
+
+def _write_object(xf, obj, tags, depth, canonical):
+    indent = '\n' + '  ' * depth
+    properties = obj.properties.items()
+    owned_objects = obj.owned_objects.items()
+    if canonical:
+        properties = sorted(properties, key=_first_key)
+        owned_objects = sorted(owned_objects, key=_first_key)
+    with xf.element(tags[obj.rdf_type], {tags[RDF_ABOUT]: str(obj.identity)}):
+        for predicate, values in properties:
+            if predicate in obj._hidden_properties or predicate == SBOL_IDENTITY:
+                continue
+            tag = tags[predicate]
+            # Drop duplicate values, as adding them to a graph would
+            values = dict.fromkeys(values)
+            if canonical:
+                values = sorted(values, key=_term_key)
+            for value in values:
+                xf.write(indent + '  ')
+                if isinstance(value, URIRef):
+                    with xf.element(tag, {tags[RDF_RESOURCE]: str(value)}):
+                        pass
+                elif isinstance(value, Literal):
+                    with xf.element(tag):
+                        xf.write(str(value))
+                else:
+                    msg = 'Cannot serialize {!r} of type {}'
+                    raise TypeError(msg.format(value, type(value).__name__))
+        for predicate, object_store in owned_objects:
+            if predicate in obj._hidden_properties:
+                continue
+            tag = tags[predicate]
+            if canonical:
+                object_store = sorted(object_store, key=_identity_key)
+            for child_obj in object_store:
+                xf.write(indent + '  ')
+                with xf.element(tag):
+                    xf.write(indent + '    ')
+                    _write_object(xf, child_obj, tags, depth + 2, canonical)
+                    xf.write(indent + '  ')
+        xf.write(indent)
+
+
+def _term_key(term):
+    # Orders any mix of RDF terms the same way on every run
+    if isinstance(term, Literal):
+        return 2, str(term), term.language or '', str(term.datatype or '')
+    return int(not isinstance(term, BNode)), str(term), '', ''
+
+
+def _triple_key(triple):
+    return tuple(_term_key(term) for term in triple)
+
+
+def _first_key(item):
+    return str(item[0])
+
+
+def _identity_key(obj):
+    return str(obj.identity)
+
+
 def prefixify(iri, prefixes, create_new):
-    for prefix in prefixes:
-        prefix_iri = prefixes[prefix]
-        if iri.startswith(prefix_iri):
-            return QName(prefix_iri, iri[len(prefix_iri):])
-    if not create_new:
-        return iri
-    fragment_start = iri.rfind('#')
-    if fragment_start == -1:
-        fragment_start = iri.rfind('/')
-    if fragment_start == -1:
-        return iri
-    iri_prefix = iri[:fragment_start + 1]
-    i = 0
-    while True:
-        prefix_name = 'ns' + str(i)
-        if prefix_name not in prefixes:
-            prefixes[prefix_name] = iri_prefix
-            return QName(iri_prefix, iri[len(iri_prefix):])
-        i = i + 1
+    return _Prefixer(prefixes, create_new)(iri)
+
+
+class _Prefixer:
+    # Turns IRIs into QNames against a table of prefix, namespace pairs.
+    # The namespaces are indexed by length, so resolving an IRI tries
+    # each distinct length once, longest first, instead of scanning
+    # every prefix. Each IRI is resolved once and then cached, so one
+    # _Prefixer should serve a whole serialization.
+
+    def __init__(self, prefixes, create_new=True):
+        self.prefixes = prefixes
+        self.create_new = create_new
+        self._namespaces = {}
+        self._lengths = []
+        self._cache = {}
+        self.used = set()
+        for prefix, namespace in prefixes.items():
+            self._index(prefix, str(namespace))
+
+    def _index(self, prefix, namespace):
+        if namespace in self._namespaces:
+            return
+        self._namespaces[namespace] = prefix
+        if len(namespace) not in self._lengths:
+            self._lengths.append(len(namespace))
+            self._lengths.sort(reverse=True)
+
+    def __call__(self, iri):
+        try:
+            return self._cache[iri]
+        except KeyError:
+            qname = self._cache[iri] = self._resolve(iri)
+            return qname
+
+    def prefixed_name(self, iri):
+        # The 'prefix:local' form of iri, or its '{namespace}local' form
+        # if its namespace is the default one
+        qname = self(iri)
+        if not isinstance(qname, QName):
+            return str(iri)
+        prefix = self._namespaces[qname.namespace]
+        self.used.add(prefix)
+        if not prefix:
+            return qname.text
+        return prefix + ':' + qname.localname
+
+    def _resolve(self, iri):
+        iri_length = len(iri)
+        for length in self._lengths:
+            if length > iri_length:
+                continue
+            prefix_iri = str(iri[:length])
+            if prefix_iri in self._namespaces:
+                return QName(prefix_iri, iri[length:])
+        if not self.create_new:
+            return iri
+        fragment_start = iri.rfind('#')
+        if fragment_start == -1:
+            fragment_start = iri.rfind('/')
+        if fragment_start == -1:
+            return iri
+        iri_prefix = str(iri[:fragment_start + 1])
+        i = 0
+        while True:
+            prefix_name = 'ns' + str(i)
+            if prefix_name not in self.prefixes:
+                self.prefixes[prefix_name] = iri_prefix
+                self._index(prefix_name, iri_prefix)
+                return QName(iri_prefix, iri[len(iri_prefix):])
+            i = i + 1
+
+
+def _tag_to_uri(tag):
+    # Convert an lxml '{namespace}local' tag into a full URI
+    if tag[0] == '{':
+        namespace, local_name = tag[1:].split('}', 1)
+        return URIRef(namespace + local_name)
+    return URIRef(tag)
+
+
+def _xml_literal(elem):
+    # The content of a parseType="Literal" element, in exclusive
+    # canonical XML, which only escapes these characters in text
+    def text(value):
+        if not value:
+            return ''
+        return (value.replace('&', '&amp;').replace('<', '&lt;')
+                .replace('>', '&gt;').replace('\r', '&#xD;'))
+    parts = [text(elem.text)]
+    for child in elem:
+        parts.append(etree.tostring(child, method='c14n', exclusive=True,
+                                    with_comments=False).decode('utf-8'))
+        parts.append(text(child.tail))
+    return ''.join(parts)
+
+
+def _resolve(uri, base):
+    if base:
+        return URIRef(urljoin(base, uri))
+    return URIRef(uri)
+
+
+class _Frame:
+    # Parser state for one open element. Node elements describe a
+    # subject, property elements describe a predicate of the enclosing
+    # subject. parse_type is 'Literal' for a parseType="Literal"
+    # property element and everything inside it, and 'Collection' for
+    # a parseType="Collection" property element.
+    __slots__ = ('is_node', 'subject', 'predicate', 'base', 'lang',
+                 'has_object', 'datatype', 'parse_type', 'last_cell',
+                 'li_count')
+
+    def __init__(self, is_node, subject, predicate, base, lang):
+        self.is_node = is_node
+        self.subject = subject
+        self.predicate = predicate
+        self.base = base
+        self.lang = lang
+        self.has_object = False
+        self.datatype = None
+        self.parse_type = None
+        # The last list cell of a collection
+        self.last_cell = None
+        # The number of rdf:li properties of a node so far
+        self.li_count = 0
+
+
+def parse_sboll2(source):
+    """Parse RDF/XML in a single streaming pass without building an
+    rdflib Graph or a complete element tree.
+
+    Relative URIs are resolved against xml:base, or else the URI of
+    the file, as rdflib does. rdf:li, rdf:parseType="Resource",
+    "Literal" and "Collection" are supported. The content of a
+    parseType="Literal" element is kept as exclusive canonical XML.
+
+    :param source: a filename or a binary file-like object
+    :return: a tuple (namespaces, type_triples, property_triples).
+        namespaces maps prefix to namespace URI. type_triples holds the
+        rdf:type triples, property_triples holds all other triples.
+    """
+    document_base = None
+    if isinstance(source, (str, os.PathLike)):
+        document_base = pathlib.Path(source).absolute().as_uri()
+    namespaces = {}
+    type_triples = []
+    property_triples = []
+    stack = []
+    context = etree.iterparse(source, events=('start-ns', 'start', 'end'),
+                              remove_comments=True, remove_pis=True)
+    for event, item in context:
+        if event == 'start-ns':
+            prefix, namespace = item
+            if prefix:
+                namespaces[prefix] = URIRef(namespace)
+            continue
+        elem = item
+        if not isinstance(elem.tag, str):
+            continue
+        if event == 'start':
+            parent = stack[-1] if stack else None
+            if parent is not None and parent.parse_type == 'Literal':
+                # Part of an XML literal, which is read at its end
+                content = _Frame(False, None, None, None, None)
+                content.parse_type = 'Literal'
+                stack.append(content)
+                continue
+            base = elem.get(XML_BASE)
+            outer_base = parent.base if parent is not None else document_base
+            if outer_base:
+                base = urljoin(outer_base, base) if base else outer_base
+            lang = elem.get(XML_LANG, parent.lang if parent else None)
+            if elem.tag == RDF_RDF and parent is None:
+                # The root acts like a property element with no predicate
+                root = _Frame(False, None, None, base, lang)
+                root.has_object = True
+                stack.append(root)
+            elif parent is None or not parent.is_node:
+                # Node element
+                stack.append(_start_node(elem, parent, base, lang,
+                                         type_triples, property_triples))
+            else:
+                stack.append(_start_property(elem, parent, base, lang,
+                                             property_triples))
+        else:
+            frame = stack.pop()
+            if frame.parse_type == 'Literal':
+                if frame.predicate is not None:
+                    literal = Literal(_xml_literal(elem), datatype=RDF.XMLLiteral)
+                    property_triples.append((frame.subject, frame.predicate,
+                                             literal))
+            elif frame.parse_type == 'Collection':
+                # Terminate the list
+                if frame.last_cell is None:
+                    property_triples.append((frame.subject, frame.predicate,
+                                             RDF.nil))
+                else:
+                    property_triples.append((frame.last_cell, RDF.rest, RDF.nil))
+            elif not frame.is_node and not frame.has_object:
+                # A property element with a literal value
+                text = elem.text or ''
+                if frame.datatype is not None:
+                    literal = Literal(text, datatype=frame.datatype)
+                elif frame.lang:
+                    literal = Literal(text, lang=frame.lang)
+                else:
+                    literal = Literal(text)
+                property_triples.append((frame.subject, frame.predicate, literal))
+            if len(stack) == 1:
+                # A top level node is done. Free it and anything before it.
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+    return namespaces, type_triples, property_triples
+
+
+def parse_sboll2_packed(source):
+    """Parse RDF/XML like parse_sboll2, and return the result packed
+    with pack_triples. This is cheaper to send between processes.
+    """
+    return pack_triples(*parse_sboll2(source))
+
+
+def pack_triples(namespaces, type_triples, property_triples):
+    """Pack the result of parse_sboll2 into plain strings and tuples.
+
+    Each distinct term is stored once in a table, and the triples refer
+    to it by position. unpack_triples reverses this.
+    """
+    table = []
+    codes = {}
+
+    def code(term):
+        if isinstance(term, Literal):
+            key = (str(term), term.language, term.datatype)
+            packed = ('l', str(term), term.language,
+                      None if term.datatype is None else str(term.datatype))
+        else:
+            key = term
+            packed = ('b' if isinstance(term, BNode) else 'u', str(term))
+        try:
+            return codes[(type(term), key)]
+        except KeyError:
+            codes[(type(term), key)] = len(table)
+            table.append(packed)
+            return len(table) - 1
+
+    return ({prefix: str(ns) for prefix, ns in namespaces.items()},
+            table,
+            [(code(s), code(p), code(o)) for s, p, o in type_triples],
+            [(code(s), code(p), code(o)) for s, p, o in property_triples])
+
+
+def unpack_triples(packed):
+    """Rebuild the result of parse_sboll2 from pack_triples output."""
+    namespaces, table, type_triples, property_triples = packed
+    terms = []
+    for kind, value, *literal in table:
+        if kind == 'u':
+            terms.append(URIRef(value))
+        elif kind == 'b':
+            terms.append(BNode(value))
+        else:
+            lang, datatype = literal
+            terms.append(Literal(value, lang=lang, datatype=datatype))
+    return ({prefix: URIRef(ns) for prefix, ns in namespaces.items()},
+            [(terms[s], terms[p], terms[o]) for s, p, o in type_triples],
+            [(terms[s], terms[p], terms[o]) for s, p, o in property_triples])
+
+
+def _start_node(elem, parent, base, lang, type_triples, property_triples):
+    if RDF_ABOUT in elem.attrib:
+        subject = _resolve(elem.get(RDF_ABOUT), base)
+    elif RDF_ID in elem.attrib:
+        subject = _resolve('#' + elem.get(RDF_ID), base)
+    elif RDF_NODE_ID in elem.attrib:
+        subject = BNode(elem.get(RDF_NODE_ID))
+    else:
+        subject = BNode()
+    frame = _Frame(True, subject, None, base, lang)
+    if elem.tag != RDF_DESCRIPTION:
+        type_triples.append((subject, RDF.type, _tag_to_uri(elem.tag)))
+    for name, value in elem.attrib.items():
+        if name in (RDF_ABOUT, RDF_ID, RDF_NODE_ID, XML_LANG, XML_BASE):
+            continue
+        if name == RDF_TYPE:
+            type_triples.append((subject, RDF.type, _resolve(value, base)))
+            continue
+        # A property attribute, which is always a literal
+        property_triples.append((subject, _tag_to_uri(name),
+                                 Literal(value, lang=lang)))
+    if parent is not None and parent.parse_type == 'Collection':
+        # This node is the next item of a list
+        cell = BNode()
+        if parent.last_cell is None:
+            property_triples.append((parent.subject, parent.predicate, cell))
+        else:
+            property_triples.append((parent.last_cell, RDF.rest, cell))
+        property_triples.append((cell, RDF.first, subject))
+        parent.last_cell = cell
+    elif parent is not None and parent.predicate is not None:
+        # This node is the object of the enclosing property element
+        property_triples.append((parent.subject, parent.predicate, subject))
+        parent.has_object = True
+    return frame
+
+
+def _start_property(elem, parent, base, lang, property_triples):
+    if elem.tag == RDF_LI:
+        # Members of containers are numbered in order
+        parent.li_count += 1
+        predicate = URIRef('%s_%d' % (rdfNS, parent.li_count))
+    else:
+        predicate = _tag_to_uri(elem.tag)
+    frame = _Frame(False, parent.subject, predicate, base, lang)
+    parse_type = elem.get(RDF_PARSE_TYPE)
+    if RDF_RESOURCE in elem.attrib:
+        obj = _resolve(elem.get(RDF_RESOURCE), base)
+    elif RDF_NODE_ID in elem.attrib:
+        obj = BNode(elem.get(RDF_NODE_ID))
+    elif parse_type == 'Resource':
+        # The property element doubles as a blank node element
+        obj = BNode()
+        property_triples.append((parent.subject, predicate, obj))
+        return _Frame(True, obj, None, base, lang)
+    elif parse_type == 'Collection':
+        frame.parse_type = parse_type
+        frame.has_object = True
+        return frame
+    elif parse_type is not None:
+        # Any other parseType is read as "Literal"
+        frame.parse_type = 'Literal'
+        frame.has_object = True
+        return frame
+    else:
+        datatype = elem.get(RDF_DATATYPE)
+        if datatype is not None:
+            frame.datatype = _resolve(datatype, base)
+        return frame
+    property_triples.append((parent.subject, predicate, obj))
+    frame.has_object = True
+    return frame
@@ -18,7 +18,7 @@ from .config import Config, ConfigOptions
 from .config import getHomespace, hasHomespace, setHomespace
 from .constants import *
 from .dbtl import Design
-from .document import Document, IGEM_STANDARD_ASSEMBLY
+from .document import Document, DocumentDiff, ObjectDelta, IGEM_STANDARD_ASSEMBLY
 from .experiment import Experiment, ExperimentalData
 from .identified import Identified
 from .implementation import Implementation
@@ -40,7 +40,7 @@ from .provo import Agent
 from .provo import Association
 from .provo import Plan
 from .provo import Usage
-from .sbolerror import SBOLError, SBOLErrorCode
+from .sbolerror import SBOLError, SBOLErrorCode, SBOLOverwriteError
 from .sequence import Sequence
 from .sequenceannotation import SequenceAnnotation
 from .toplevel import TopLevel
@@ -283,24 +283,32 @@ class ComponentDefinition(TopLevel):
                                 'callback must return a list of ComponentDefinitions')
 
         # Instantiate a Component for each ComponentDefinition in the list
-        instance_list = []
-        for cdef in component_list:
+        self._create_components(component_list)
+        return component_list
 
-            # Generate URI of new Component.  Check if an object with that URI is
-            # already instantiated.
-            instance_count = 0
+    def _create_components(self, component_list):
+        # Create a Component for each ComponentDefinition in the list and
+        # add them all in one batch. Instances of a part are numbered from
+        # the first id not already in use.
+        instance_counts = {}
+        components = []
+        for cdef in component_list:
+            # Instances only ever get taken, so the search for a free one
+            # picks up where the last one for this part ended
+            instance_count = instance_counts.get(cdef.displayId, 0)
             component_id = self.persistentIdentity + "/" + cdef.displayId + "_" \
                 + str(instance_count) + "/" + self.version
-            while self.find(component_id):
-                # Find the last instance assigned
+            while self.doc.find(component_id):
                 instance_count += 1
                 component_id = self.persistentIdentity + "/" + cdef.displayId + "_" \
                     + str(instance_count) + "/" + self.version
-
-            c = self.components.create(cdef.displayId + "_" + str(instance_count))
+            instance_counts[cdef.displayId] = instance_count + 1
+            c = Component(uri=cdef.displayId + "_" + str(instance_count),
+                          version=self.version)
             c.definition = cdef.identity
-            instance_list.append(c)
-        return component_list
+            components.append(c)
+        self.components.add_many(components)
+        return components
 
     def assemblePrimaryStructure(self, primary_structure, assembly_method=None,
                                  doc=None):
@@ -335,32 +343,34 @@ class ComponentDefinition(TopLevel):
                 primary_structure.append(cdef)
 
         self.types += [SO_LINEAR]
+        self._constrain_primary_structure(primary_structure)
 
+    def _constrain_primary_structure(self, primary_structure):
+        # Match each ComponentDefinition with one of its Components, then
+        # iterate pairwise through the Components, and place SequenceConstraints
+        # between adjacent ones. The old constraints are cleared first, so the
+        # constraint ids are all free.
         component_map = {}
         for c in self.components:
             if c.definition not in component_map:
                 component_map[c.definition] = [c]
             else:
                 component_map[c.definition].append(c)
-        primary_structure_components = []
+        components = []
         for cd in primary_structure:
-            primary_structure_components.append(component_map[cd.identity].pop())
+            components.append(component_map[cd.identity].pop())
 
-        # Iterate pairwise through the primary_structure, and place SequenceConstraints
-        # between adjacent ComponentDefinitions.
         if len(self.sequenceConstraints):
             self.sequenceConstraints.clear()
-        for upstream, downstream in zip(primary_structure_components[:-1],
-                                        primary_structure_components[1:]):
-            instance_count = 0
-            constraint_id = 'constraint_%d' % instance_count
-            while constraint_id in self.sequenceConstraints:
-                instance_count += 1
-                constraint_id = 'constraint_%d' % instance_count
-            sc = self.sequenceConstraints.create(constraint_id)
+        constraints = []
+        for upstream, downstream in zip(components[:-1], components[1:]):
+            sc = SequenceConstraint(uri='constraint_%d' % len(constraints),
+                                    version=self.version)
             sc.subject = upstream
             sc.object = downstream
             sc.restriction = SBOL_RESTRICTION_PRECEDES
+            constraints.append(sc)
+        self.sequenceConstraints.add_many(constraints)
 
     def compile(self, assembly_method=None):
         """Compiles an abstraction hierarchy of ComponentDefinitions
@@ -702,10 +712,14 @@ class ComponentDefinition(TopLevel):
                             'This ComponentDefinition has no '
                             'components')
 
-        arbitrary_component = self.components[0]
-        next_component = arbitrary_component
-        while self.hasUpstreamComponent(next_component):
-            next_component = self.getUpstreamComponent(next_component)
+        if len(self.sequenceConstraints) < 1:
+            raise SBOLError(SBOLErrorCode.SBOL_ERROR_NOT_FOUND,
+                            'Cannot determine upstream Component. '
+                            'Self has no SequenceConstraints')
+        _, upstream = self._precedes_links()
+        next_component = self.components[0]
+        for next_component in self._follow_links(next_component, upstream):
+            pass
         return next_component
 
     def getLastComponent(self):
@@ -722,12 +736,64 @@ class ComponentDefinition(TopLevel):
                             'This ComponentDefinition has no '
                             'components')
 
-        arbitrary_component = self.components[0]
-        next_component = arbitrary_component
-        while self.hasDownstreamComponent(next_component):
-            next_component = self.getDownstreamComponent(next_component)
+        if len(self.sequenceConstraints) < 1:
+            raise SBOLError(SBOLErrorCode.SBOL_ERROR_NOT_FOUND,
+                            'Cannot determine downstream Component. '
+                            'Self has no SequenceConstraints')
+        downstream, _ = self._precedes_links()
+        next_component = self.components[0]
+        for next_component in self._follow_links(next_component, downstream):
+            pass
         return next_component
 
+    def _precedes_links(self):
+        # Map the identity of each Component to the identity of the
+        # Component that follows it, and back, according to the
+        # precedes SequenceConstraints. A Component with two
+        # neighbours on the same side is an error.
+        downstream = {}
+        upstream = {}
+        for sc in self.sequenceConstraints:
+            if sc.restriction != SBOL_RESTRICTION_PRECEDES:
+                continue
+            subject = str(sc.subject)
+            obj = str(sc.object)
+            if subject in downstream:
+                raise ValueError('ComponentDefinition <%s> does not describe a linear '
+                                 'primary structure. Component <%s> precedes both '
+                                 '<%s> and <%s>.'
+                                 % (self.identity, subject, downstream[subject], obj))
+            if obj in upstream:
+                raise ValueError('ComponentDefinition <%s> does not describe a linear '
+                                 'primary structure. Component <%s> follows both '
+                                 '<%s> and <%s>.'
+                                 % (self.identity, obj, upstream[obj], subject))
+            downstream[subject] = obj
+            upstream[obj] = subject
+        return downstream, upstream
+
+    def _follow_links(self, component, links, components=None):
+        # Yield the Components reached from component, one link of
+        # _precedes_links() at a time, until there are no more links.
+        # components maps identities to this object's Components.
+        if components is None:
+            components = {str(c.identity): c for c in self.components}
+        seen = {str(component.identity)}
+        uri = links.get(str(component.identity))
+        while uri is not None:
+            component = components.get(uri)
+            if component is None:
+                component = self.components[uri]
+            identity = str(component.identity)
+            if identity in seen:
+                raise ValueError('ComponentDefinition <%s> does not describe a linear '
+                                 'primary structure. Its SequenceConstraints form a '
+                                 'cycle through Component <%s>.'
+                                 % (self.identity, identity))
+            seen.add(identity)
+            yield component
+            uri = links.get(identity)
+
     def applyToComponentHierarchy(self, callback=None, user_data=None):
         """Perform an operation on every Component in a structurally-linked
         hierarchy of Components by applying a callback function.
@@ -746,6 +812,8 @@ class ComponentDefinition(TopLevel):
         Components.
 
         :return: A list of Components.
+        :raises: ValueError if the precedes SequenceConstraints do not put
+        all the Components in one linear order.
         """
         subcomponents = []
         if len(self.components) == 1:
@@ -758,12 +826,34 @@ class ComponentDefinition(TopLevel):
                                  'a complete primary structure. It appears to be '
                                  'missing SequenceConstraints.' % self.identity)
 
-            c_first = self.getFirstComponent()
+            # Order the Components by following the precedes links,
+            # indexed once, upstream to the first and back down
+            downstream, upstream = self._precedes_links()
+            components = {str(c.identity): c for c in self.components}
+            c_first = self.components[0]
+            for c_first in self._follow_links(c_first, upstream, components):
+                pass
             subcomponents.append(c_first)
-            c_next = c_first
-            while self.hasDownstreamComponent(c_next):
-                c_next = self.getDownstreamComponent(c_next)
-                subcomponents.append(c_next)
+            subcomponents.extend(self._follow_links(c_first, downstream, components))
+            if len(subcomponents) < len(components):
+                # Some Components are not linked to the first one, so
+                # the structure is not linear. Report a cycle among them
+                # if there is one, otherwise the missing link.
+                placed = {str(c.identity) for c in subcomponents}
+                unlinked = next(identity for identity in components
+                                if identity not in placed)
+                for identity, c in components.items():
+                    if identity in placed:
+                        continue
+                    placed.add(identity)
+                    for c_next in self._follow_links(c, downstream, components):
+                        if str(c_next.identity) in placed:
+                            break
+                        placed.add(str(c_next.identity))
+                raise ValueError('ComponentDefinition <%s> does not describe a linear '
+                                 'primary structure. Component <%s> is not linked '
+                                 'to Component <%s> by precedes SequenceConstraints.'
+                                 % (self.identity, unlinked, c_first.identity))
         return subcomponents
 
     def getPrimaryStructure(self):
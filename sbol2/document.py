@@ -1,9 +1,10 @@
 import collections.abc
+import concurrent.futures
 import logging
 import os
 import posixpath
 import time
-from typing import Any, Dict, Mapping, Union
+from typing import Any, Dict, Mapping, Optional, Tuple, Union
 import warnings
 
 from deprecated import deprecated
@@ -39,6 +40,7 @@ from .property import OwnedObject, URIProperty
 from .provo import Plan, Activity, Agent, Usage, Association
 from .sbolerror import SBOLError
 from .sbolerror import SBOLErrorCode
+from .sbolerror import SBOLOverwriteError
 from .sequence import Sequence
 from .sequenceannotation import SequenceAnnotation
 from .sequenceconstraint import SequenceConstraint
@@ -86,6 +88,265 @@ Config.SBOL_DATA_MODEL_REGISTER = {
 }
 
 
+class _PendingTriples:
+    """The triples of a lazily read Document, grouped by subject, for
+    the objects that have not been built yet."""
+
+    def __init__(self, type_triples, triples):
+        # Subject -> its RDF types, in file order
+        self.types: Dict[str, list] = {}
+        # Subject -> its (predicate, object) pairs, other than rdf:type
+        self.triples: Dict[str, list] = {}
+        # RDF type -> the TopLevel subjects of that type, as an ordered set
+        self.top_levels: Dict[str, Dict[str, None]] = {}
+        # RDF type -> (is TopLevel, URIs of its owned object properties)
+        self._kinds: Dict[str, tuple] = {}
+        for s, _, o in type_triples:
+            self.types.setdefault(str(s), []).append(o)
+        rdf_type = rdflib.RDF.type
+        for s, p, o in triples:
+            if p != rdf_type:
+                self.triples.setdefault(str(s), []).append((p, o))
+        for subject, types in self.types.items():
+            if self.is_root(subject):
+                self.top_levels.setdefault(str(types[0]), {})[subject] = None
+
+    def _kind(self, type_uri):
+        # The parser builds an object from the first of its types
+        try:
+            return self._kinds[type_uri]
+        except KeyError:
+            pass
+        builder = Config.SBOL_DATA_MODEL_REGISTER.get(type_uri)
+        if builder is None:
+            kind = None
+        else:
+            prototype = builder()
+            kind = (prototype.is_top_level(),
+                    frozenset(str(k) for k in prototype.owned_objects))
+        self._kinds[type_uri] = kind
+        return kind
+
+    def _has_persistent_identity(self, subject):
+        return any(p == SBOL_PERSISTENT_IDENTITY
+                   for p, _ in self.triples.get(subject, ()))
+
+    def is_root(self, subject):
+        # True if the subject becomes a TopLevel, so that it can be
+        # built without building its referrers first
+        kind = self._kind(self.types[subject][0])
+        if kind is None:
+            # Unregistered types with a persistentIdentity become
+            # generic TopLevels, the rest are annotation objects
+            return self._has_persistent_identity(subject)
+        return kind[0]
+
+    def take(self, subjects=None):
+        """Remove the given subjects and everything they own from the
+        pending set, and return their type triples, their other
+        triples and the subjects taken. Takes everything if subjects
+        is None."""
+        everything = subjects is None
+        if everything:
+            subjects = list(self.types)
+        type_triples = []
+        triples = []
+        taken = []
+        rdf_type = rdflib.RDF.type
+        for root in subjects:
+            stack = [str(root)]
+            while stack:
+                subject = stack.pop()
+                types = self.types.pop(subject, None)
+                if types is None:
+                    continue
+                taken.append(subject)
+                self.top_levels.get(str(types[0]), {}).pop(subject, None)
+                kind = self._kind(types[0])
+                owned = kind[1] if kind is not None else frozenset()
+                uri = URIRef(subject)
+                for type_uri in types:
+                    type_triples.append((uri, rdf_type, type_uri))
+                for p, o in self.triples.pop(subject, ()):
+                    triples.append((uri, p, o))
+                    o_str = str(o)
+                    if o_str not in self.types:
+                        continue
+                    if str(p) in owned or (self._kind(self.types[o_str][0]) is None
+                                           and not self.is_root(o_str)):
+                        # An owned object or a nested annotation object
+                        stack.append(o_str)
+        if everything:
+            # Triples about subjects with no type are passed on as well
+            for subject, pairs in self.triples.items():
+                uri = URIRef(subject)
+                triples.extend((uri, p, o) for p, o in pairs)
+            self.triples.clear()
+            self.top_levels.clear()
+        return type_triples, triples, taken
+
+    def __bool__(self):
+        return bool(self.types)
+
+
+class ObjectDelta:
+    """The changes that turn an SBOL object into the object with the
+    same identity in another Document, as found by Document.diff. For
+    a new object, or one whose class changed, the delta holds the
+    object's whole content and complete is True.
+    """
+
+    def __init__(self, identity, rdf_type, complete=False):
+        self.identity = identity
+        self.rdf_type = rdf_type
+        self.complete = complete
+        # Property URI to the new values of each changed property
+        self.properties = {}
+        # Owned object property URI to a list of ObjectDeltas, each
+        # holding the whole content of a new owned object
+        self.added = {}
+        # Owned object property URI to the identities of the owned
+        # objects that were removed
+        self.removed = {}
+        # Owned object property URI to the ObjectDeltas of the owned
+        # objects that changed
+        self.changed = {}
+
+    def __bool__(self):
+        return bool(self.complete or self.properties or self.added
+                    or self.removed or self.changed)
+
+    def __repr__(self):
+        return '{}({!r}, {!r})'.format(type(self).__name__, self.identity,
+                                       self.rdf_type)
+
+
+class DocumentDiff:
+    """The differences between two Documents, as returned by
+    Document.diff and taken by Document.apply_patch. added, removed and
+    changed are sorted lists of TopLevel URIs. A DocumentDiff holds
+    only rdflib terms and plain containers, so it can be pickled.
+    """
+
+    def __init__(self, added, removed, changed, deltas=None, properties=None,
+                 namespaces=None):
+        # In the other Document only
+        self.added = added
+        # In this Document only
+        self.removed = removed
+        # In both, but different
+        self.changed = changed
+        # URI to the ObjectDelta of each added and changed TopLevel
+        self.deltas = {} if deltas is None else deltas
+        # Property URI to the new values of each changed property of
+        # the Document itself
+        self.properties = {} if properties is None else properties
+        # The namespaces of the other Document, if they differ
+        self.namespaces = namespaces
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed
+                    or self.properties or self.namespaces is not None)
+
+    def __repr__(self):
+        return '{}(added={!r}, removed={!r}, changed={!r})'.format(
+            type(self).__name__, self.added, self.removed, self.changed)
+
+
+def _changed_properties(mine, theirs):
+    # Property URI to the values in theirs, for each property whose
+    # values differ as a set
+    changed = {}
+    for rdf_type in mine.properties.keys() | theirs.properties.keys():
+        values = theirs.properties.get(rdf_type, [])
+        if set(mine.properties.get(rdf_type, [])) != set(values):
+            changed[rdf_type] = list(values)
+    return changed
+
+
+def _complete_delta(obj):
+    # An ObjectDelta holding the whole content of obj
+    delta = ObjectDelta(str(obj.identity), str(obj.rdf_type), complete=True)
+    for rdf_type, values in obj.properties.items():
+        if values:
+            delta.properties[rdf_type] = list(values)
+    for rdf_type, object_store in obj.owned_objects.items():
+        if object_store:
+            delta.added[rdf_type] = [_complete_delta(o) for o in object_store]
+    return delta
+
+
+def _object_delta(mine, theirs):
+    # The ObjectDelta that turns mine into theirs. Owned objects are
+    # matched by identity, and only descended into when their digests
+    # differ.
+    if type(mine) is not type(theirs) or mine.rdf_type != theirs.rdf_type:
+        return _complete_delta(theirs)
+    delta = ObjectDelta(str(theirs.identity), str(theirs.rdf_type))
+    delta.properties = _changed_properties(mine, theirs)
+    for rdf_type in mine.owned_objects.keys() | theirs.owned_objects.keys():
+        my_objects = {str(o.identity): o
+                      for o in mine.owned_objects.get(rdf_type, [])}
+        their_objects = {str(o.identity): o
+                         for o in theirs.owned_objects.get(rdf_type, [])}
+        added = [_complete_delta(o) for uri, o in their_objects.items()
+                 if uri not in my_objects]
+        removed = sorted(my_objects.keys() - their_objects.keys())
+        changed = [_object_delta(my_objects[uri], o)
+                   for uri, o in their_objects.items()
+                   if uri in my_objects and not my_objects[uri].compare(o)]
+        if added:
+            delta.added[rdf_type] = added
+        if removed:
+            delta.removed[rdf_type] = removed
+        if changed:
+            delta.changed[rdf_type] = changed
+    return delta
+
+
+def _merge_delta(full, delta):
+    # Apply delta to full, a complete ObjectDelta, and return the
+    # complete ObjectDelta of the result
+    if delta.complete:
+        return delta
+    merged = ObjectDelta(full.identity, full.rdf_type, complete=True)
+    merged.properties = dict(full.properties)
+    for rdf_type, values in delta.properties.items():
+        if values:
+            merged.properties[rdf_type] = values
+        else:
+            merged.properties.pop(rdf_type, None)
+    for rdf_type in full.added.keys() | delta.added.keys():
+        removed = set(delta.removed.get(rdf_type, ()))
+        changed = {d.identity: d for d in delta.changed.get(rdf_type, ())}
+        children = [_merge_delta(child, changed[child.identity])
+                    if child.identity in changed else child
+                    for child in full.added.get(rdf_type, ())
+                    if child.identity not in removed]
+        children += delta.added.get(rdf_type, [])
+        if children:
+            merged.added[rdf_type] = children
+    return merged
+
+
+def _delta_triples(delta, type_triples, triples):
+    # Append the triples describing the object of a complete
+    # ObjectDelta, and its owned objects, as the Document's parser
+    # takes them
+    subject = URIRef(delta.identity)
+    type_triples.append((subject, rdflib.RDF.type, URIRef(delta.rdf_type)))
+    for rdf_type, values in delta.properties.items():
+        if rdf_type == SBOL_IDENTITY:
+            continue
+        predicate = URIRef(rdf_type)
+        triples.extend((subject, predicate, value) for value in values)
+    for rdf_type, children in delta.added.items():
+        predicate = URIRef(rdf_type)
+        for child in children:
+            triples.append((subject, predicate, URIRef(child.identity)))
+            _delta_triples(child, type_triples, triples)
+
+
 class Document(Identified):
     """
     The Document is a container for all SBOL data objects.
@@ -118,6 +379,24 @@ class Document(Identified):
         # representations use rdflib types.
         # self.SBOLObjects: Dict[rdflib.URIRef, SBOLObject] = {}
         self.SBOLObjects = URIDict()
+        # Maps the identity of every object in the Document, TopLevel
+        # or child, to that object. Keys are plain strings.
+        self._identity_index: Dict[str, SBOLObject] = {}
+        # Maps a URI to the objects that may hold it as a property
+        # value. Entries are candidates: referrers() verifies them and
+        # prunes the ones that have gone stale.
+        self._referrers: Dict[str, Dict[SBOLObject, None]] = {}
+        # Maps each object represented in self.graph to the subject its
+        # triples were written under, or None when self.graph does not
+        # mirror the Document and has to be rebuilt from scratch.
+        self._graph_subjects: Optional[Dict[SBOLObject, URIRef]] = None
+        # Objects whose triples in self.graph are out of date
+        self._dirty_objects: Dict[SBOLObject, None] = {}
+        # Triples of the objects not built yet, after a lazy read
+        self._lazy: Optional[_PendingTriples] = None
+        # Maps the identity and version of a ComponentDefinition to its
+        # last compiled Sequence, see Sequence.compile()
+        self._compile_cache: Dict[Tuple[str, str], Any] = {}
 
         self._namespaces = {}
         self.resource_namespaces = set()
@@ -178,12 +457,244 @@ class Document(Identified):
     def compare(self, other):
         # Let the super class do the bulk of the comparison. Super
         # compares owned objects and properties.
+        self._materialize()
+        if isinstance(other, Document):
+            other._materialize()
         if not super().compare(other):
             return False
         if self._namespaces != other._namespaces:
             return False
         return True
 
+    def diff(self, other):
+        """Find the differences between this Document and another.
+
+        TopLevel objects are matched by identity and compared by
+        content, using the same digests as compare(), so unchanged
+        objects cost a dictionary lookup each. Only the objects that
+        differ are descended into to find their deltas.
+
+        :param other: The Document to compare this one to.
+        :return: A DocumentDiff listing the URIs of the TopLevels that
+        are only in other (added), only in this Document (removed) and
+        in both with different content (changed), with the ObjectDelta
+        of each added and changed one. Passing it to apply_patch turns
+        this Document, or a copy of it, into other.
+        """
+        self._materialize()
+        other._materialize()
+        mine = self._top_levels_by_identity()
+        theirs = other._top_levels_by_identity()
+        added = sorted(theirs.keys() - mine.keys())
+        removed = sorted(mine.keys() - theirs.keys())
+        changed = sorted(uri for uri in mine.keys() & theirs.keys()
+                         if not mine[uri].compare(theirs[uri]))
+        deltas = {uri: _complete_delta(theirs[uri]) for uri in added}
+        for uri in changed:
+            deltas[uri] = _object_delta(mine[uri], theirs[uri])
+        namespaces = None
+        if self._namespaces != other._namespaces:
+            namespaces = dict(other._namespaces)
+        return DocumentDiff(added, removed, changed, deltas,
+                            _changed_properties(self, other), namespaces)
+
+    def apply_patch(self, diff):
+        """Apply the changes found by diff to this Document.
+
+        The Document must hold every TopLevel that diff removes or
+        changes, and none that it adds. Changed TopLevels keep their
+        Python objects, but their owned objects are rebuilt.
+
+        :param diff: A DocumentDiff, as returned by diff.
+        :return: None
+        """
+        self._materialize()
+        mine = self._top_levels_by_identity()
+        missing = [uri for uri in diff.removed + diff.changed if uri not in mine]
+        if missing:
+            raise SBOLError(SBOLErrorCode.NOT_FOUND_ERROR,
+                            ', '.join(missing) + ' not found')
+        existing = [uri for uri in diff.added if uri in self._identity_index]
+        if existing:
+            raise SBOLOverwriteError(existing)
+        # Work out the new content of each changed TopLevel before
+        # touching the Document
+        type_triples = []
+        triples = []
+        replaced = []
+        for uri in diff.changed:
+            delta = diff.deltas[uri]
+            if delta.complete:
+                # A different class, which needs a new object
+                replaced.append(mine[uri])
+            else:
+                delta = _merge_delta(_complete_delta(mine[uri]), delta)
+            _delta_triples(delta, type_triples, triples)
+        for uri in diff.added:
+            _delta_triples(diff.deltas[uri], type_triples, triples)
+        for uri in diff.removed:
+            self._remove_top_level(mine[uri])
+        for obj in replaced:
+            self._remove_top_level(obj)
+        for rdf_type, values in diff.properties.items():
+            self.properties[rdf_type] = list(values)
+        self._invalidate_hash()
+        if diff.namespaces is not None:
+            self._namespaces = dict(diff.namespaces)
+        # Changed TopLevels are rewritten in place by _clear_overwritten,
+        # which drops the lookup tables of the containers holding them
+        self._append_triples({}, type_triples, triples, overwrite=True)
+
+    def compile_all(self, assembly_method=None):
+        """Compile the sequence of every ComponentDefinition in this
+        Document that has components.
+
+        This gives the same results as calling compile() on each of
+        them in turn, in Document order. ComponentDefinitions are
+        compiled once and reused wherever they appear as parts, until
+        their components, sequenceConstraints, sourceLocations or
+        Sequence elements change.
+
+        :param assembly_method: As for ComponentDefinition.compile.
+        :return: A dict mapping the identity of each compiled
+        ComponentDefinition to its sequence.
+        """
+        self._materialize()
+        designs = [cd for cd in self.componentDefinitions if len(cd.components)]
+        return {str(cd.identity): cd.compile(assembly_method=assembly_method)
+                for cd in designs}
+
+    def assemble_many(self, designs, assembly_method=None):
+        """Assemble the primary structures of many ComponentDefinitions.
+
+        Each design is assembled as assemblePrimaryStructure() would
+        assemble it, but parts are looked up once for the whole batch,
+        and the Components and SequenceConstraints of a design are
+        added together, with one uniqueness check each. A design that
+        fails is reported and the rest of the batch carries on. The
+        design's components, sequenceConstraints and types are put
+        back as they were, and any ComponentDefinitions that were
+        added to this Document for it are removed again.
+
+        :param designs: A mapping, or an iterable of pairs, from each
+        design to its list of parts. A design is a ComponentDefinition,
+        or the identity or displayId of one in this Document. A
+        displayId that is not found names a new ComponentDefinition.
+        Parts are ComponentDefinitions, or their identities or
+        displayIds.
+        :param assembly_method: As for assemblePrimaryStructure.
+        :return: A dict mapping each design that failed, as given, to
+        the exception it raised.
+        """
+        if not Config.getOption(ConfigOptions.SBOL_COMPLIANT_URIS):
+            raise EnvironmentError('Assemble method requires SBOL-compliance enabled')
+        self._materialize()
+        if isinstance(designs, collections.abc.Mapping):
+            designs = designs.items()
+        parts = {}
+        errors = {}
+        for design, part_list in designs:
+            added = []
+            snapshot = None
+            try:
+                if not isinstance(part_list, (list, tuple)):
+                    raise TypeError('Invalid component_list specified. Please '
+                                    'provide a list of ComponentDefinitions or, '
+                                    'alternatively, a list of ComponentDefinition '
+                                    'displayIds')
+                primary_structure = [self._assembly_part(part, parts)
+                                     for part in part_list]
+                cd = self._assembly_design(design)
+                snapshot = (cd, list(cd.components), list(cd.sequenceConstraints),
+                            list(cd.types))
+                for cdef in [cd] + primary_structure:
+                    if not cdef.doc:
+                        self.addComponentDefinition(cdef)
+                        added.append(cdef)
+                if assembly_method:
+                    primary_structure = assembly_method(primary_structure)
+                    if not all(type(c) is ComponentDefinition
+                               for c in primary_structure):
+                        raise TypeError('Invalid callback specified for '
+                                        'assembly_method. The callback must '
+                                        'return a list of ComponentDefinitions')
+                cd._create_components(primary_structure)
+                cd.types += [SO_LINEAR]
+                cd._constrain_primary_structure(primary_structure)
+            except (SBOLError, TypeError, ValueError) as e:
+                if snapshot is not None:
+                    self._restore_assembly_design(*snapshot)
+                for cdef in reversed(added):
+                    self.componentDefinitions.remove(cdef.identity)
+                errors[design] = e
+        return errors
+
+    def _assembly_part(self, part, parts):
+        # Look up a part for assemble_many, remembering the string ids
+        # already looked up in parts
+        if isinstance(part, ComponentDefinition):
+            if part.doc and part.doc is not self:
+                raise ValueError('Invalid component_list specified. Assembly '
+                                 'subcomponents must belong to the same Document '
+                                 'as self.')
+            return part
+        if not isinstance(part, str):
+            raise TypeError('Invalid component_list specified. Please provide a list '
+                            'of ComponentDefinitions or, alternatively, a list of '
+                            'ComponentDefinition displayIds')
+        cdef = parts.get(part)
+        if cdef is None:
+            cdef = self.componentDefinitions.find(part)
+            if not cdef:
+                raise ValueError('Invalid component_list specified. '
+                                 'ComponentDefinition <%s> not found.' % part)
+            parts[part] = cdef
+        return cdef
+
+    def _assembly_design(self, design):
+        # Look up, or create, the ComponentDefinition to assemble for
+        # assemble_many
+        if isinstance(design, ComponentDefinition):
+            if design.doc and design.doc is not self:
+                raise ValueError('Invalid design specified. The ComponentDefinition '
+                                 '<%s> belongs to another Document.' % design.identity)
+            return design
+        if not isinstance(design, str):
+            raise TypeError('Invalid design specified. Please provide a '
+                            'ComponentDefinition or a ComponentDefinition displayId')
+        cd = self.componentDefinitions.find(design)
+        if not cd:
+            cd = ComponentDefinition(design)
+        return cd
+
+    @staticmethod
+    def _restore_assembly_design(cd, components, constraints, types):
+        # Undo what a failed assemble_many did to a design, given its
+        # contents from before
+        components = set(components)
+        for c in list(cd.components):
+            if c not in components:
+                cd.components.remove(c.identity)
+        if set(cd.sequenceConstraints) != set(constraints):
+            cd.sequenceConstraints.clear()
+            cd.sequenceConstraints.add_many(constraints)
+        cd.types = types
+
+    def _top_levels_by_identity(self):
+        # The objects compare() looks at, from the Document's own stores
+        return {str(obj.identity): obj for object_store in self.owned_objects.values()
+                for obj in object_store}
+
+    def _remove_top_level(self, obj):
+        # Take a TopLevel and its owned objects out of the Document
+        self.owned_objects[obj.rdf_type].remove(obj)
+        if self._owned_indexes is not None:
+            self._owned_indexes.pop(obj.rdf_type, None)
+        self.SBOLObjects.pop(obj.identity, None)
+        self._unindex_object(obj)
+        obj.doc = None
+        self._invalidate_hash()
+
     def addCitation(self, new_citation):
         val = self.citations
         val.append(new_citation)
@@ -214,6 +725,7 @@ class Document(Identified):
         """
         # Check for uniqueness of URI
         identity_uri = sbol_obj.identity
+        self._materialize_uri(identity_uri)
         if identity_uri in self.SBOLObjects:
             raise SBOLError(SBOLErrorCode.SBOL_ERROR_URI_NOT_UNIQUE,
                             'Cannot add ' + sbol_obj.identity +
@@ -223,12 +735,21 @@ class Document(Identified):
             # If TopLevel add to Document.
             if sbol_obj.is_top_level():
                 self.SBOLObjects[identity_uri] = sbol_obj
+                self._index_object(sbol_obj)
+                self._invalidate_hash()
             type_uri = rdflib.URIRef(sbol_obj.getTypeURI())
             if type_uri in self.owned_objects:
                 sbol_obj.parent = self  # Set back-pointer to parent object
                 # Add the object to the Document's property store,
                 # eg. componentDefinitions, moduleDefinitions, etc.
-                self.owned_objects[type_uri].append(sbol_obj)
+                object_store = self.owned_objects[type_uri]
+                object_store.append(sbol_obj)
+                # Keep the lookup tables of the store up to date, rather
+                # than have the next lookup rebuild them
+                index = (self._owned_indexes or {}).get(str(type_uri))
+                if (index is not None and index.store is object_store
+                        and index.size == len(object_store) - 1):
+                    index.add(sbol_obj)
             sbol_obj.doc = self
             # Notify the object that it has been added
             sbol_obj._added_to_document(self)
@@ -238,7 +759,79 @@ class Document(Identified):
                     if child_obj.doc != self:
                         self.add(child_obj)
 
+    def _index_object(self, sbol_obj):
+        # Register an object and its owned objects in the identity index.
+        # Owned objects at every depth belong to this Document from here
+        # on, so their changes get tracked.
+        sbol_obj.doc = self
+        self._identity_index[str(sbol_obj.identity)] = sbol_obj
+        self._mark_dirty(sbol_obj)
+        for values in sbol_obj.properties.values():
+            self._index_references(sbol_obj, values)
+        for rdf_type, object_store in sbol_obj.owned_objects.items():
+            if rdf_type in sbol_obj._hidden_properties:
+                continue
+            for child_obj in object_store:
+                self._index_object(child_obj)
+
+    def _index_references(self, sbol_obj, values):
+        # Record sbol_obj as a possible referrer of each URI in values
+        for value in values:
+            if isinstance(value, URIRef):
+                self._referrers.setdefault(str(value), {})[sbol_obj] = None
+
+    def _unindex_object(self, sbol_obj):
+        # Remove an object and its owned objects from the identity index
+        identity = str(sbol_obj.identity)
+        if self._identity_index.get(identity) is sbol_obj:
+            del self._identity_index[identity]
+        self._mark_dirty(sbol_obj)
+        for rdf_type, object_store in sbol_obj.owned_objects.items():
+            if rdf_type in sbol_obj._hidden_properties:
+                continue
+            for child_obj in object_store:
+                self._unindex_object(child_obj)
+
+    def _reindex_object(self, sbol_obj, old_identity):
+        # Called when the identity of an indexed object changes
+        old_identity = str(old_identity)
+        if self._identity_index.get(old_identity) is sbol_obj:
+            del self._identity_index[old_identity]
+            self._identity_index[str(sbol_obj.identity)] = sbol_obj
+        self._mark_dirty(sbol_obj)
+
+    def _mark_dirty(self, sbol_obj):
+        # Flag an object, and the parent whose ownership triple names
+        # it, so update_graph() regenerates their triples
+        if self._graph_subjects is None:
+            # The graph gets rebuilt in full anyway
+            return
+        self._dirty_objects[sbol_obj] = None
+        if sbol_obj.parent is not None:
+            self._dirty_objects[sbol_obj.parent] = None
+
     def add_list(self, sbol_objs):
+        """
+        Register a batch of objects in the Document.
+
+        The identities of the whole batch are checked for uniqueness
+        before any object is added, so a failed check leaves the
+        Document unchanged.
+
+        :param sbol_objs: An iterable of SBOL objects
+        :return: None
+        """
+        sbol_objs = list(sbol_objs)
+        identities = set()
+        for sbol_obj in sbol_objs:
+            identity_uri = str(sbol_obj.identity)
+            self._materialize_uri(identity_uri)
+            if identity_uri in self.SBOLObjects or identity_uri in identities:
+                raise SBOLError(SBOLErrorCode.SBOL_ERROR_URI_NOT_UNIQUE,
+                                'Cannot add ' + sbol_obj.identity +
+                                ' to Document. An object with this identity '
+                                'is already contained in the Document')
+            identities.add(identity_uri)
         for obj in sbol_objs:
             self.add(obj)
 
@@ -357,6 +950,7 @@ class Document(Identified):
         :rtype: SBOLObject
         :raises: SBOLError if the given uri is not found
         """
+        self._materialize_uri(uri)
         try:
             return self.SBOLObjects[uri]
         except KeyError:
@@ -392,38 +986,136 @@ class Document(Identified):
         return self.collections.get(uri)
 
     # File I/O #
-    def write(self, filename):
+    def write(self, filename, streaming: bool = False, canonical: bool = False):
         """
         Serialize all objects in this Document to an RDF/XML file.
 
         :param filename: The full name of the file you want to write
         (including file extension).
+        :param streaming: Boolean indicating whether to write elements
+        incrementally instead of building the whole document in memory.
+        If validation is enabled the written file is read back as text
+        and sent to the validator, so the text of the file is held in
+        memory for the request.
+        :param canonical: Boolean indicating whether to write objects,
+        properties and namespaces in sorted order, so that equal Documents
+        give byte-identical files. Streaming and non-streaming files
+        differ in layout, so only compare files written the same way.
         :return: A string with the validation results,
         or empty string if validation is disabled.
         """
-        self.doc_serialize_rdf2xml(filename)
+        if streaming:
+            self._materialize()
+            SBOL2Serialize.write_sboll2(list(self.SBOLObjects.values()),
+                                        self._namespaces, filename,
+                                        canonical=canonical)
+        else:
+            self.doc_serialize_rdf2xml(filename, canonical=canonical)
         # Optionally validate
         result = 'Validation disabled. To enable use of validation, use'
         result += ' Config.setOption(ConfigOptions.VALIDATE, True)'
         if Config.getOption(ConfigOptions.VALIDATE):
             t_start = time.time()
-            result = self.validate()
+            if streaming:
+                # Validate what was written rather than serializing
+                # the whole Document again with rdflib
+                with open(filename, encoding='utf-8') as fp:
+                    result = self._validate(fp.read())
+            else:
+                result = self.validate()
             if Config.getOption(ConfigOptions.VERBOSE):
                 t_end = time.time()
                 print(f'Validation request took {t_end - t_start} seconds')
         return result
 
-    def read(self, filename):
+    def read(self, filename, streaming: bool = False, lazy: bool = False):
         """
         Read an RDF/XML file and attach the SBOL objects to this Document.
 
         Existing contents of the Document will be wiped.
+
+        With lazy=True the triples are only indexed by subject, and
+        each TopLevel object is built, along with its children, the
+        first time it is looked up by URI. Using one of the Document's
+        containers, e.g. iterating over componentDefinitions, builds
+        every object of that type. Operations that span the whole
+        Document, such as write, compare, len and iteration, build
+        everything that is left.
         :param filename: The full name of the file you want to read
         (including file extension).
+        :param streaming: Boolean indicating whether to parse the file in
+        a single streaming pass instead of loading it into an rdflib Graph.
+        The result is the same except that rdf:parseType="Literal"
+        values are kept as exclusive canonical XML.
+        :param lazy: Boolean indicating whether to build objects on
+        first access instead of all at once
         :return: None
         """
         self.clear()
-        self.append(filename, overwrite=False)
+        if not lazy:
+            self.append(filename, overwrite=False, streaming=streaming)
+            return
+        if streaming:
+            namespaces, type_triples, triples = SBOL2Serialize.parse_sboll2(filename)
+            namespaces = namespaces.items()
+        else:
+            graph = rdflib.Graph()
+            graph.parse(filename, format='application/rdf+xml')
+            namespaces = graph.namespaces()
+            type_triples = graph.triples((None, rdflib.RDF.type, None))
+            triples = graph
+        for prefix, ns in namespaces:
+            self._namespaces[prefix] = ns
+        self._lazy = _PendingTriples(type_triples, triples)
+        if not self._lazy:
+            self._lazy = None
+
+    def _materialize(self, subjects=None):
+        # Build the given subjects of a lazily read Document, and the
+        # objects they own. With no subjects, build everything left.
+        pending = self._lazy
+        if pending is None:
+            return
+        # Parsing may look objects up, which must not recurse into here
+        self._lazy = None
+        try:
+            type_triples, triples, taken = pending.take(subjects)
+            if subjects is None:
+                taken = None
+            self._parse_triples((), type_triples, triples, taken)
+        finally:
+            if pending:
+                self._lazy = pending
+
+    def _materialize_uri(self, uri):
+        # Build the object with this identity if it is still pending
+        pending = self._lazy
+        uri = str(uri)
+        if pending is None or uri not in pending.types:
+            return
+        if pending.is_root(uri):
+            self._materialize([uri])
+        else:
+            # A child object, which is built with the TopLevel owning it
+            self._materialize()
+
+    def _materialize_type(self, rdf_type):
+        # Build all the pending TopLevels of this type
+        pending = self._lazy
+        if pending is None:
+            return
+        subjects = pending.top_levels.get(str(rdf_type))
+        if subjects:
+            self._materialize(list(subjects))
+
+    def _lazy_get(self, rdf_type, uri):
+        # Find the TopLevel of this type and identity, building it if
+        # needed, without building the rest of its type
+        self._materialize_uri(uri)
+        obj = self.SBOLObjects.get(uri)
+        if obj is not None and str(obj.rdf_type) == str(rdf_type):
+            return obj
+        return None
 
     def readString(self, sbol_str):
         """Read an RDF/XML string and attach the SBOL objects to
@@ -437,19 +1129,23 @@ class Document(Identified):
         self.clear()
         self.appendString(sbol_str, overwrite=False)
 
-    def writeString(self):
+    def writeString(self, canonical: bool = False):
         """
         Convert data objects in this Document into textual SBOL.
 
+        :param canonical: Boolean indicating whether to write objects,
+        properties and namespaces in sorted order, so that equal Documents
+        give identical strings
         :return: A string representation of the objects in this Document.
         """
         # Save any changes we've made to the graph.
         self.update_graph()
         # Write graph to string
-        rdf = SBOL2Serialize.serialize_sboll2(self.graph).decode('utf-8')
+        rdf = SBOL2Serialize.serialize_sboll2(self.graph,
+                                              canonical=canonical).decode('utf-8')
         return rdf
 
-    def append(self, filename, overwrite: bool = False):
+    def append(self, filename, overwrite: bool = False, streaming: bool = False):
         """
         Read an RDF/XML file and attach the SBOL objects to this Document.
 
@@ -457,8 +1153,19 @@ class Document(Identified):
         :param filename: The full name of the file you want to read
         (including file extension).
         :param overwrite: Boolean indicating whether to overwrite existing objects
+        :param streaming: Boolean indicating whether to parse the file in
+        a single streaming pass instead of loading it into an rdflib Graph
         :return: None
         """
+        if streaming:
+            # The streaming parser reads the XML incrementally and produces
+            # plain triples, so neither an rdflib Graph nor a full element
+            # tree is ever held in memory.
+            namespaces, type_triples, property_triples = \
+                SBOL2Serialize.parse_sboll2(filename)
+            self._append_triples(namespaces, type_triples, property_triples,
+                                 overwrite)
+            return
         new_graph = rdflib.Graph()
         new_graph.parse(filename, format='application/rdf+xml')
         self._append_graph(new_graph, overwrite)
@@ -479,28 +1186,114 @@ class Document(Identified):
         new_graph.parse(data=sbol_str, format='application/rdf+xml')
         self._append_graph(new_graph, overwrite)
 
+    def append_many(self, filenames, overwrite: bool = False,
+                    workers: Optional[int] = None):
+        """
+        Read several RDF/XML files and attach their SBOL objects to this
+        Document.
+
+        The files are parsed concurrently in worker processes with the
+        streaming parser, then merged into the Document in one pass.
+        Either all the files are added or, if an object would have to
+        be overwritten and overwrite is False, none of them. With
+        overwrite, an object in a later file replaces the one with the
+        same identity in an earlier file, as successive calls to
+        append would.
+        :param filenames: The full names of the files to read
+        :param overwrite: Boolean indicating whether to overwrite existing objects
+        :param workers: The number of worker processes, by default the
+        number of CPUs. With 1, the files are parsed in this process.
+        :return: None
+        """
+        filenames = list(filenames)
+        if workers == 1 or len(filenames) < 2:
+            batches = [SBOL2Serialize.parse_sboll2(f) for f in filenames]
+        else:
+            # Workers send back packed triples, which are much cheaper
+            # to unpickle than rdflib terms
+            with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+                batches = [SBOL2Serialize.unpack_triples(packed) for packed in
+                           executor.map(SBOL2Serialize.parse_sboll2_packed,
+                                        filenames)]
+        # Map each typed subject to the last file that describes it
+        sources = {}
+        duplicates = {}
+        for i, (_, type_triples, _) in enumerate(batches):
+            for subject, _, _ in type_triples:
+                source = sources.get(subject, i)
+                if source != i:
+                    duplicates[str(subject)] = None
+                sources[subject] = i
+        if not overwrite:
+            # Report clashes between files and with objects already in
+            # the Document together, before anything is changed
+            self._materialize()
+            duplicates.update(dict.fromkeys(
+                str(s) for s in sources if str(s) in self._identity_index))
+            if duplicates:
+                raise SBOLOverwriteError(sorted(duplicates))
+        namespaces = {}
+        type_triples = []
+        property_triples = []
+        for i, (batch_namespaces, batch_types, batch_triples) in enumerate(batches):
+            namespaces.update(batch_namespaces)
+            type_triples.extend(t for t in batch_types if sources[t[0]] == i)
+            property_triples.extend(t for t in batch_triples
+                                    if sources.get(t[0], i) == i)
+        self._append_triples(namespaces, type_triples, property_triples,
+                             overwrite)
+
     def _append_graph(self, new_graph: rdflib.Graph, overwrite: bool):
+        self._materialize()
+        type_triples = list(new_graph.triples((None, rdflib.RDF.type, None)))
+        identities = self._clear_overwritten(type_triples, overwrite)
+        # Make the new graph be the graph we parse
+        self.graph = new_graph
+        # Load the new graph into the existing document
+        self._parse_triples(new_graph.namespaces(), type_triples, new_graph,
+                            self._appended_subjects(identities))
+
+    def _append_triples(self, namespaces, type_triples, property_triples,
+                        overwrite: bool):
+        self._materialize()
+        identities = self._clear_overwritten(type_triples, overwrite)
+        self._parse_triples(namespaces.items(), type_triples, property_triples,
+                            self._appended_subjects(identities))
+
+    def _appended_subjects(self, identities):
+        # The objects to link up after an append: the new ones, and
+        # leftovers of earlier reads, which may be annotation objects
+        # of the new ones. Objects already linked up are left alone.
+        subjects = dict.fromkeys(identities)
+        for k, obj in self.SBOLObjects.items():
+            if not isinstance(obj, TopLevel):
+                subjects[k] = None
+        return list(subjects)
+
+    def _clear_overwritten(self, type_triples, overwrite: bool):
         # Gather all the objects that will be overwritten, stopping
         # if the user says not to overwrite. If we clear as we go we lose
         # the ability to find objects within objects. So gather the list
-        # here, and clear them as a second pass.
-        objects_to_clear = []
-        identities = (s for s, _, _ in
-                      new_graph.triples((None, rdflib.RDF.type, None)))
-        objects = (self.find(identity) for identity in identities)
-        objects_to_clear = [obj for obj in objects if obj is not None]
-        if overwrite is False and objects_to_clear:
-            msg = objects_to_clear[0].identity
-            count = len(objects_to_clear)
-            if count > 1:
-                msg += f' and {count - 1} others'
-            msg += ' would require overwriting'
-            raise SBOLError(SBOLErrorCode.DUPLICATE_URI_ERROR, msg)
+        # here, and clear them as a second pass. Returns the identities
+        # of the incoming objects.
+        identities = dict.fromkeys(str(s) for s, _, _ in type_triples)
+        overwritten = sorted(identities.keys() & self._identity_index.keys())
+        if overwrite is False and overwritten:
+            raise SBOLOverwriteError(overwritten)
+        objects_to_clear = [self._identity_index[uri] for uri in overwritten]
         # Clear out the internal stores of the objects_to_clear so that
         # they will be overwritten. Keep the identity property because it
         # does not get restored by the graph parsing. Keep all the keys in
         # the internal stores so owned objects end up in the right place.
         for existing_object in objects_to_clear:
+            existing_object._invalidate_hash()
+            # The lookup keys are rewritten in place, so the containers
+            # holding the object rebuild their tables on next use
+            holder = existing_object.parent
+            if holder is None:
+                holder = self
+            holder._owned_indexes = None
+            existing_object._owned_indexes = None
             if existing_object.identity not in self.SBOLObjects:
                 self.SBOLObjects[existing_object.identity] = existing_object
             # Now clear the object. It will get reconstituted below by parse_all
@@ -510,16 +1303,32 @@ class Document(Identified):
                     continue
                 existing_object.properties[k] = []
             for k in existing_object.owned_objects:
+                for child_obj in existing_object.owned_objects[k]:
+                    self._unindex_object(child_obj)
                 existing_object.owned_objects[k] = []
-        # Make the new graph be the graph we parse
-        self.graph = new_graph
-        # Load the new graph into the existing document
-        self.parse_all()
+        # Children that are also being overwritten were dropped from the
+        # index above. They are reused by parse_all, so put them back.
+        for existing_object in objects_to_clear:
+            self._identity_index[str(existing_object.identity)] = existing_object
+        return list(identities)
 
     def parse_all(self):
+        self._parse_triples(self.graph.namespaces(),
+                            self.graph.triples((None, rdflib.RDF.type, None)),
+                            self.graph)
+
+    def _parse_triples(self, namespaces, type_triples, triples, subjects=None):
+        # If subjects is given, only the objects with those identities
+        # are linked up afterwards, instead of the whole Document
+        # Parsing fills in objects without going through the Property
+        # setters, so the graph must be rebuilt on the next update, and
+        # the Document's digest recomputed
+        self._graph_subjects = None
+        self._dirty_objects.clear()
+        self._invalidate_hash()
         # Parse namespaces
         self.logger.debug("*** Reading in namespaces (graph): ")
-        for ns in self.graph.namespaces():
+        for ns in namespaces:
             self.logger.debug(ns)
             self._namespaces[ns[0]] = ns[1]
         if self.logger.isEnabledFor(logging.DEBUG):
@@ -527,7 +1336,7 @@ class Document(Identified):
             for ns in self._namespaces:
                 self.logger.debug(ns)
         # Instantiate all objects with an RDF type
-        for s, _, o in self.graph.triples((None, rdflib.RDF.type, None)):
+        for s, _, o in type_triples:
             self.parse_objects_inner(s, o)
         # Find the graph base uri.  This is the location of the sbol
         # file, and begins with the "file://" scheme.  Any URI in the
@@ -540,7 +1349,7 @@ class Document(Identified):
         if pos != -1:
             pos += 1
         rdf_type = rdflib.RDF.type
-        for result_s, result_p, result_o in self.graph:
+        for result_s, result_p, result_o in triples:
             # Look for properties
             if result_p != rdf_type:
                 obj = result_o
@@ -555,7 +1364,11 @@ class Document(Identified):
         #
         # Note: use a list of the keys so that we can modify the dict
         # while we iterate.
-        for k in list(self.SBOLObjects.keys()):
+        if subjects is None:
+            keys = list(self.SBOLObjects.keys())
+        else:
+            keys = [k for k in subjects if k in self.SBOLObjects]
+        for k in keys:
             so = self.SBOLObjects[k]
             if isinstance(so, TopLevel):
                 continue
@@ -563,34 +1376,49 @@ class Document(Identified):
                 # Not TopLevel and already has parent, remove from
                 # SBOLObjects
                 del self.SBOLObjects[k]
+                if so.parent is self:
+                    # Never claimed by an owner, so it is unreachable
+                    self._unindex_object(so)
                 continue
             self.logger.debug('Orphan %r', so)
 
+        objects = None
+        if subjects is not None:
+            objects = [self.SBOLObjects[k] for k in keys if k in self.SBOLObjects]
         # Handle the annotation objects
-        self.parse_annotation_objects()
+        self.parse_annotation_objects(objects)
         # Dress document
-        self.dress_document()
+        self.dress_document(objects)
 
     def parse_objects_inner(self, subject, obj):
         # Construct the top-level object if we haven't already done so
         # and its type is something we know about.
         if subject not in self.SBOLObjects and obj in Config.SBOL_DATA_MODEL_REGISTER:
-            # Call constructor for the appropriate SBOLObject
-            new_obj = Config.SBOL_DATA_MODEL_REGISTER[obj]()
-            if isinstance(new_obj, Identified):
-                # Clear out the version. it will get set later
-                new_obj.version = ''
+            builder = Config.SBOL_DATA_MODEL_REGISTER[obj]
+            if isinstance(builder, type) and issubclass(builder, SBOLObject):
+                # Construct the object with empty property stores. New
+                # property values will be added as properties are
+                # parsed from the input file
+                new_obj = builder._from_rdf(subject)
+            else:
+                # Call constructor for the appropriate SBOLObject
+                new_obj = builder()
+                if isinstance(new_obj, Identified):
+                    # Clear out the version. it will get set later
+                    new_obj.version = ''
+                # Wipe default property values passed from default
+                # constructor.
+                for prop_name, values in new_obj.properties.items():
+                    values.clear()
+                new_obj.identity = subject
             if self.logger.isEnabledFor(logging.DEBUG):
                 self.logger.debug("New object type: " + str(type(new_obj)))
                 self.logger.debug("New object attrs: " + str(vars(new_obj)))
-            # Wipe default property values passed from default
-            # constructor. New property values will be added as properties
-            # are parsed from the input file
-            for prop_name, values in new_obj.properties.items():
-                values.clear()
-            new_obj.identity = subject
             # Update document
             self.SBOLObjects[new_obj.identity] = new_obj
+            self._identity_index[str(subject)] = new_obj
+            # The identity is a property value too
+            self._referrers.setdefault(str(subject), {})[new_obj] = None
             new_obj.doc = self
             # For now, set the parent to the Document.
             # This may get overwritten later for child objects.
@@ -608,6 +1436,8 @@ class Document(Identified):
             new_obj.identity = subject
             new_obj.rdf_type = obj
             self.SBOLObjects[new_obj.identity] = new_obj
+            self._identity_index[str(subject)] = new_obj
+            self._referrers.setdefault(str(subject), {})[new_obj] = None
             new_obj.doc = self
 
     def parse_properties_inner(self, subject, predicate, obj):
@@ -625,6 +1455,8 @@ class Document(Identified):
                     # triple is a property
                     if obj not in parent.properties[predicate]:
                         parent.properties[predicate].append(obj)
+                        if isinstance(obj, URIRef):
+                            self._referrers.setdefault(str(obj), {})[parent] = None
                 elif predicate in parent.owned_objects:
                     # triple is an owned object
                     owned_obj = self.SBOLObjects[obj]
@@ -635,6 +1467,8 @@ class Document(Identified):
                 else:
                     # Extension data
                     parent.properties[predicate] = [obj]
+                    if isinstance(obj, URIRef):
+                        self._referrers.setdefault(str(obj), {})[parent] = None
             else:
                 msg = 'Subject {} ({}) not found in my SBOLObjects'
                 msg = msg.format(subject, type(subject))
@@ -645,19 +1479,51 @@ class Document(Identified):
         objects. The list will be empty if no references were found.
 
         """
+        return self.referrers(uri)
+
+    def referrers(self, uri):
+        """Find the objects in this Document that hold the given URI as a
+        property value, either an ontology term or a reference to
+        another object.
+
+        Values written through Property attributes or read from a file
+        are tracked. Values appended directly to an object's
+        `properties` store are not.
+
+        :param uri: The URI to search for.
+        :return: A list of referring objects, empty if there are none.
+        """
+        self._materialize()
+        candidates = self._referrers.get(str(uri))
+        if not candidates:
+            return []
+        uri = URIRef(uri)
         references = []
-        for obj in self.SBOLObjects.values():
-            references.extend(obj.find_reference(uri))
+        stale = []
+        for obj in candidates:
+            if (self._identity_index.get(str(obj.identity)) is obj and
+                    any(uri in values for values in obj.properties.values())):
+                references.append(obj)
+            else:
+                stale.append(obj)
+        for obj in stale:
+            del candidates[obj]
+        if not candidates:
+            del self._referrers[str(uri)]
         return references
 
-    def parse_annotation_objects(self):
+    def parse_annotation_objects(self, objects=None):
         """Parse leftover objects from reading and link them up where they
         belong. These are usually extension-type objects.
 
+        :param objects: The objects to consider, by default all of
+        SBOLObjects
         """
-        for uri, obj in self.SBOLObjects.items():
+        if objects is None:
+            objects = list(self.SBOLObjects.values())
+        for obj in objects:
             self.logger.debug('Possible annotation object %s', obj.identity)
-        annotation_objects = [obj for obj in self.SBOLObjects.values()
+        annotation_objects = [obj for obj in objects
                               if not isinstance(obj, TopLevel)]
         for ao in annotation_objects:
             self.logger.debug('Annotation object: %s', ao.identity)
@@ -671,6 +1537,7 @@ class Document(Identified):
                 tl.doc = self
                 tl_identity_uri = rdflib.URIRef(tl.identity)
                 self.SBOLObjects[tl_identity_uri] = tl
+                self._index_object(tl)
             else:
                 # Determine the RDF type of the member property that
                 # contains this kind of annotation object
@@ -710,8 +1577,10 @@ class Document(Identified):
                     ao_identity_uri = rdflib.URIRef(ao.identity)
                     del self.SBOLObjects[ao_identity_uri]
 
-    def infer_resource_namespaces(self):
-        for obj in self.SBOLObjects.values():
+    def infer_resource_namespaces(self, objects=None):
+        if objects is None:
+            objects = self.SBOLObjects.values()
+        for obj in objects:
             if not isinstance(obj, Identified):
                 continue
             if not (obj.persistentIdentity and obj.displayId and obj.version):
@@ -729,8 +1598,8 @@ class Document(Identified):
             if uri.endswith(typed_suffix):
                 self.resource_namespaces.add(uri[0:-len(typed_suffix)])
 
-    def dress_document(self):
-        self.infer_resource_namespaces()
+    def dress_document(self, objects=None):
+        self.infer_resource_namespaces(objects)
         # There is a lot more that is done in libSBOL Document::dress_document()
         # TODO: do more of that here
 
@@ -759,6 +1628,13 @@ class Document(Identified):
         # Properties to keep, which don't make sense to clear
         keepers = [SBOL_VERSION]
         self.SBOLObjects.clear()
+        self._identity_index.clear()
+        self._referrers.clear()
+        self._graph_subjects = None
+        self._dirty_objects.clear()
+        self._lazy = None
+        self._compile_cache.clear()
+        self._invalidate_hash()
         for name, value in self.properties.items():
             if name in keepers:
                 # Do not erase properties on the keepers list
@@ -792,31 +1668,64 @@ class Document(Identified):
         # TODO better docstring
         raise NotImplementedError("Not yet implemented")
 
-    def doc_serialize_rdf2xml(self, outfile):
+    def doc_serialize_rdf2xml(self, outfile, canonical=False):
         """
         Serialize RDF XML.
         :param outfile: output file
+        :param canonical: write in sorted order, see write()
         :return: None
         """
         self.update_graph()
-        rdf = SBOL2Serialize.serialize_sboll2(self.graph).decode('utf-8')
+        rdf = SBOL2Serialize.serialize_sboll2(self.graph,
+                                              canonical=canonical).decode('utf-8')
         self.logger.debug("RDF: " + rdf)
         self.logger.debug("TYPE: " + str(type(rdf)))
         with open(outfile, 'w') as out:
             out.write(rdf)
             out.flush()
 
-    def update_graph(self):
+    def update_graph(self, rebuild: bool = False):
         """
         Update the RDF triples representation of data.
+
+        Only the triples of objects changed since the last update are
+        retracted and regenerated. Changes made by writing to an
+        object's properties dict directly bypass this tracking; pass
+        rebuild=True to regenerate the whole graph in that case.
+        :param rebuild: Boolean indicating whether to rebuild the graph
+        from scratch
         :return:
         """
-        self.graph = rdflib.Graph()
-        for prefix, ns in self._namespaces.items():
-            self.graph.bind(prefix, ns)
-        # ASSUMPTION: Document does not have properties. Is this a valid assumption?
-        for obj in self.SBOLObjects.values():
-            obj.build_graph(self.graph)
+        self._materialize()
+        if rebuild or self._graph_subjects is None:
+            self.graph = rdflib.Graph()
+            for prefix, ns in self._namespaces.items():
+                self.graph.bind(prefix, ns)
+            # ASSUMPTION: Document does not have properties. Is this a valid
+            # assumption?
+            for obj in self.SBOLObjects.values():
+                obj.build_graph(self.graph)
+            self._graph_subjects = {obj: URIRef(identity) for identity, obj
+                                    in self._identity_index.items()}
+            self._dirty_objects.clear()
+        else:
+            for prefix, ns in self._namespaces.items():
+                self.graph.bind(prefix, ns)
+            dirty_objects = list(self._dirty_objects)
+            self._dirty_objects.clear()
+            # Retract all the stale triples before adding any, because an
+            # object may have taken over the identity of another one
+            for obj in dirty_objects:
+                subject = self._graph_subjects.pop(obj, None)
+                if subject is not None:
+                    self.graph.remove((subject, None, None))
+            for obj in dirty_objects:
+                identity = str(obj.identity)
+                if self._identity_index.get(identity) is not obj:
+                    # No longer part of the Document
+                    continue
+                obj._build_own_graph(self.graph)
+                self._graph_subjects[obj] = URIRef(identity)
         if self.logger.isEnabledFor(logging.DEBUG):
             for s, p, o in self.graph:
                 self.logger.debug('Graph contains: %r', (s, p, o))
@@ -828,7 +1737,11 @@ class Document(Identified):
         :return: A string containing a message with the validation results
         :rtype: str
         """
-        response = validate(self, config.options)
+        return self._validate()
+
+    def _validate(self, main_file: Optional[str] = None):
+        # main_file is the serialized Document, if the caller has it
+        response = validate(self, config.options, main_file)
         if response['valid']:
             result = "Valid."
         else:
@@ -845,6 +1758,7 @@ class Document(Identified):
 
         :return: The total number of objects in the Document.
         """
+        self._materialize()
         return len(self.SBOLObjects)
 
     def __len__(self):
@@ -881,6 +1795,7 @@ class Document(Identified):
     #
 
     def __iter__(self):
+        self._materialize()
         self.current_obj = 0
         self.owned_objects_list = []
         for obj in self.SBOLObjects.values():
@@ -922,6 +1837,7 @@ class Document(Identified):
 
         :return: A string representation of the Document.
         """
+        self._materialize()
         summary = ''
         col_size = 30
         total_core_objects = 0
@@ -952,11 +1868,9 @@ class Document(Identified):
         :return: A pointer to the SBOLObject,
         or NULL if an object with this identity doesn't exist.
         """
-        for obj in self.SBOLObjects.values():
-            match = obj.find(uri)
-            if match is not None:
-                return match
-        return None
+        if self._lazy is not None:
+            self._materialize_uri(uri)
+        return self._identity_index.get(str(uri))
 
     def getTypeURI(self):
         return URIRef(SBOL_DOCUMENT)
@@ -964,6 +1878,7 @@ class Document(Identified):
     def getTopLevel(self, uri):
         # Ensure it's a URI Ref
         uri = rdflib.URIRef(uri)
+        self._materialize_uri(uri)
         if uri not in self.SBOLObjects:
             msg = 'Top level object {} is not in document'
             msg = msg.format(uri)
@@ -985,6 +1900,7 @@ class Document(Identified):
         # copy method, we short-circuit its default behavior to auto-increment version.
         if version is None:
             version = self.version
+        self._materialize()
         return super().copy(target_doc, target_namespace, version)
 
     def exportToFormat(self, language: str, output_path: str):
@@ -1112,8 +2028,11 @@ def _make_validation_request(options: Mapping[str, Union[bool, str]]):
     return dict(options=request_options)
 
 
-def validate(doc: Document, options: Mapping[str, Any]):
+def validate(doc: Document, options: Mapping[str, Any],
+             main_file: Optional[str] = None):
     """
+    :param main_file: The serialized Document, or None to serialize
+    it with doc.writeString()
     :rtype: Dict[str, Any]
     """
     return_file_key = config.ConfigOptions.RETURN_FILE.value
@@ -1122,7 +2041,9 @@ def validate(doc: Document, options: Mapping[str, Any]):
     json_request = _make_validation_request(options)
     # We always want the return file
     json_request[return_file_key] = options[return_file_key]
-    json_request['main_file'] = doc.writeString()
+    if main_file is None:
+        main_file = doc.writeString()
+    json_request['main_file'] = main_file
 
     if not validate_online:
         result = do_validation(json_request)
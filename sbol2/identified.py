@@ -147,20 +147,15 @@ class Identified(SBOLObject):
             # Reset SBOLCompliant properties
             self.identity = obj_id
             self.persistentIdentity = persistent_id
-            # Check for uniqueness of URI in local object properties
-            matches = parent.find_property_value(SBOL_IDENTIFIED, obj_id)
-            if len(matches) > 0:
-                raise SBOLError(SBOLErrorCode.SBOL_ERROR_URI_NOT_UNIQUE,
-                                "Cannot update SBOL-compliant URI. The URI " +
-                                str(self.identity) + " is not unique")
             for rdf_type, store in self.owned_objects.items():
                 if rdf_type not in self._hidden_properties:
                     for nested_obj in store:
                         nested_obj.update_uri()
-        # Check for uniqueness of URI in Document
+        # Check for uniqueness of URI in Document. The Document's identity
+        # index may already map this URI to self, which is not a conflict.
         if parent.doc:
-            matches = parent.doc.find_property_value(SBOL_IDENTITY, self.identity)
-            if len(matches) > 0:
+            match = parent.doc.find(self.identity)
+            if match is not None and match is not self:
                 raise SBOLError(SBOLErrorCode.SBOL_ERROR_URI_NOT_UNIQUE,
                                 "Cannot update SBOL-compliant URI. "
                                 "An object with URI " + str(self.identity) +
@@ -284,6 +279,8 @@ class Identified(SBOLObject):
                 o_copy = o.copy(target_doc, target_namespace, version)
                 new_obj.owned_objects[property_uri].append(o_copy)
                 o_copy.parent = self
+                if o_copy.doc is not None:
+                    o_copy.doc._index_object(o_copy)
                 # o_copy.update_uri()
 
         return new_obj
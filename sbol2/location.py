@@ -96,6 +96,8 @@ class GenericLocation(Location):
 
 
 class OwnedLocation(OwnedObject):
+    __slots__ = ()
+
     def __init__(self, property_owner, sbol_uri, lower_bound, upper_bound,
                  validation_rules=None, first_object=None):
         """Initialize a container and optionally put the first object in it.
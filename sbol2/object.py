@@ -1,3 +1,4 @@
+import hashlib
 import logging
 import posixpath
 from typing import List
@@ -18,34 +19,95 @@ from . import SBOL2Serialize
 from . import validation
 
 
-# This is an internal function, not part of the public API
-def _compare_properties(obj1, obj2):
-    obj1_keys = obj1.properties.keys()
-    if sorted(obj1_keys) != sorted(obj2.properties.keys()):
-        return False
-    # Keys are equal, check values by converting to sets
-    for k in obj1_keys:
-        if set(obj1.properties[k]) != set(obj2.properties[k]):
-            return False
-    return True
+def _values_key(values):
+    # Property values compare as a set. The repr of an rdflib term
+    # names its class, datatype and language, so ordering and digesting
+    # values by repr tells apart all the values a set does.
+    if len(values) < 2:
+        return tuple(values)
+    return tuple(sorted(set(values), key=repr))
 
 
-# This is an internal function, not part of the public API
-def _compare_owned_objects(obj1, obj2):
-    obj1_keys = obj1.owned_objects.keys()
-    if sorted(obj1_keys) != sorted(obj2.owned_objects.keys()):
-        return False
-    # Keys are equal, check values by converting to dicts
-    for k in obj1_keys:
-        # Recursively compare child objects
-        oo1 = {oo.identity: oo for oo in obj1.owned_objects[k]}
-        oo2 = {oo.identity: oo for oo in obj2.owned_objects[k]}
-        if oo1.keys() != oo2.keys():
-            return False
-        for uri in oo1:
-            if not oo1[uri].compare(oo2[uri]):
-                return False
-    return True
+_MISSING = object()
+
+
+class _PropertyAttribute:
+    """Class-level accessor for a Property held by an SBOLObject.
+
+    Each SBOLObject keeps its own Property instances in its instance
+    __dict__. The first time a Property is assigned to an attribute, an
+    accessor is installed on the object's class under the same name, so
+    that reading the attribute returns the Property's value (or the
+    owned object, for OwnedObjects with an upper bound of 1) and
+    assigning to it calls Property.set. Ordinary attributes never pass
+    through here.
+    """
+
+    __slots__ = ('name', 'shadowed')
+
+    def __init__(self, name, shadowed=_MISSING):
+        self.name = name
+        # The plain class attribute this accessor replaced, if any,
+        # served to instances which do not hold a Property of this name
+        self.shadowed = shadowed
+
+    @classmethod
+    def install(cls, owner_class, name):
+        existing = _MISSING
+        for klass in owner_class.__mro__:
+            if name in klass.__dict__:
+                existing = klass.__dict__[name]
+                break
+        if hasattr(type(existing), '__set__'):
+            # Already installed here or on a base class, or a Python
+            # property or other data descriptor which is left alone
+            return
+        setattr(owner_class, name, cls(name, existing))
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            if self.shadowed is _MISSING:
+                return self
+            return self.shadowed
+        try:
+            value = obj.__dict__[self.name]
+        except KeyError:
+            shadowed = self.shadowed
+            if shadowed is _MISSING:
+                raise AttributeError("'%s' object has no attribute '%s'"
+                                     % (type(obj).__name__, self.name))
+            if hasattr(type(shadowed), '__get__'):
+                return shadowed.__get__(obj, objtype)
+            return shadowed
+        if isinstance(value, OwnedObject):
+            if value._upperBound == '1':
+                return value[0] if value else None
+            return value
+        if isinstance(value, Property):
+            # Make Property attributes transparent so they look like
+            # native types
+            return value.value
+        return value
+
+    def __set__(self, obj, value):
+        attrs = obj.__dict__
+        prop = attrs.get(self.name)
+        if isinstance(value, Property) or not isinstance(prop, Property):
+            attrs[self.name] = value
+            return
+        if self.name == 'identity' and obj.doc is not None:
+            # Keep the Document's identity index in sync
+            old_identity = prop.value
+            prop.set(value)
+            obj.doc._reindex_object(obj, old_identity)
+            return
+        prop.set(value)
+
+    def __delete__(self, obj):
+        try:
+            del obj.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(self.name)
 
 
 class SBOLObject:
@@ -76,6 +138,19 @@ class SBOLObject:
     # see Section 11.2 of the [SBOL specification document
     # (http://sbolstandard.org/wp-content/uploads/2015/08/SBOLv2.0.1.pdf).
 
+    # Defaults shared by all instances, so that objects which never
+    # change them do not each carry their own copy.
+    _default_namespace = None
+    # URIs of properties that are not serialized
+    _hidden_properties = ()
+    # Lookup tables for the OwnedObject containers, by property URI.
+    # Created on first lookup.
+    _owned_indexes = None
+    # Triples of objects a lazily read Document has not built yet
+    _lazy = None
+    # Digest of the object's content, see _structural_hash()
+    _content_hash = None
+
     def __init__(self, type_uri=rdflib.URIRef(UNDEFINED),
                  uri=rdflib.URIRef("example")):
         """Open-world constructor."""
@@ -83,10 +158,7 @@ class SBOLObject:
         self.properties = URIDict()  # map<rdf_type, vector<SBOLObject>>
         self.doc = None
         self.parent = None
-        self._default_namespace = None
-        self._hidden_properties = []
         self.rdf_type = str(type_uri)
-        self._namespaces = {}
         self.identity = URIProperty(self, SBOL_IDENTITY, '0', '1',
                                     [validation.sbol_rule_10202])
         uri = URIRef(uri)
@@ -94,6 +166,57 @@ class SBOLObject:
             uri = posixpath.join(getHomespace(), uri)
         self.identity = uri
 
+    @classmethod
+    def _from_rdf(cls, identity):
+        """Construct an object with the given identity and every other
+        property store empty, ready to be filled in from RDF triples.
+
+        For the classes in this package the Property objects are copied
+        from a template instance built once per class, which skips the
+        default values and URIs that the constructor computes and a
+        parser would only throw away. Extension classes may keep other
+        state or have side effects in their constructors, so they are
+        always constructed.
+        """
+        template = cls.__dict__.get('_rdf_template')
+        if template is None:
+            if cls.__module__.partition('.')[0] != __name__.partition('.')[0]:
+                template = False
+            else:
+                template = cls()
+                if any(template.owned_objects.values()):
+                    # The constructor creates child objects, which the
+                    # parser keeps, so it has to run every time
+                    template = False
+            cls._rdf_template = template
+        if template is False:
+            obj = cls()
+            for values in obj.properties.values():
+                values.clear()
+            obj.identity = identity
+            return obj
+        obj = cls.__new__(cls)
+        attrs = obj.__dict__
+        for name, value in template.__dict__.items():
+            if name == 'properties' or name == 'owned_objects':
+                # Filled in below
+                pass
+            elif isinstance(value, Property):
+                value = value._copy_for(obj)
+            elif isinstance(value, (list, dict, set)):
+                value = value.copy()
+            attrs[name] = value
+        properties = URIDict()
+        for rdf_type in template.properties:
+            dict.__setitem__(properties, rdf_type, [])
+        dict.__setitem__(properties, SBOL_IDENTITY, [URIRef(identity)])
+        attrs['properties'] = properties
+        owned_objects = URIDict()
+        for rdf_type in template.owned_objects:
+            dict.__setitem__(owned_objects, rdf_type, [])
+        attrs['owned_objects'] = owned_objects
+        return obj
+
     @property
     def logger(self):
         logger = logging.getLogger('sbol2')
@@ -246,19 +369,48 @@ class SBOLObject:
         """Compare two SBOLObjects. The behavior is currently undefined for
         objects with custom annotations or extension classes.
 
+        Changes made through Property attributes and OwnedObject methods
+        are seen. Values edited directly in an object's `properties`
+        store are not.
+
         :param other: The object being compared to this one.
         :return: True if the objects are identical, False if they are different.
 
         """
         if type(other) != type(self):
             return False
-        if self.rdf_type != other.rdf_type:
-            return False
-        if not _compare_properties(self, other):
-            return False
-        if not _compare_owned_objects(self, other):
-            return False
-        return True
+        return self._structural_hash() == other._structural_hash()
+
+    def _structural_hash(self):
+        # A digest of everything compare() looks at: the class, the
+        # values of each property as a set, and the owned objects by
+        # identity, recursively. It is cached until the object or one of
+        # its owned objects changes, so comparing unchanged objects again
+        # is cheap. Changes that bypass the Property and OwnedObject
+        # methods must call _invalidate_hash().
+        digest = self._content_hash
+        if digest is None:
+            properties = tuple((rdf_type, _values_key(values))
+                               for rdf_type, values in sorted(self.properties.items()))
+            # The digest of an owned object covers its identity
+            owned_objects = tuple(
+                (rdf_type,
+                 tuple(sorted({obj._structural_hash() for obj in object_store})))
+                for rdf_type, object_store in sorted(self.owned_objects.items()))
+            content = (type(self).__module__, type(self).__qualname__,
+                       str(self.rdf_type), properties, owned_objects)
+            digest = hashlib.blake2b(repr(content).encode(),
+                                     digest_size=16).digest()
+            self._content_hash = digest
+        return digest
+
+    def _invalidate_hash(self):
+        # Drop the cached digest of this object and of the objects
+        # that own it, whose digests cover this one
+        obj = self
+        while obj is not None:
+            obj._content_hash = None
+            obj = obj.parent
 
     def getPropertyValue(self, property_uri: str) -> str:
         """Get the value of a custom annotation property by its URI.
@@ -315,6 +467,9 @@ class SBOLObject:
             raise TypeError('%r is not a string', val)
         # Ensure that the property is a URIRef
         property_uri = rdflib.URIRef(property_uri)
+        self._invalidate_hash()
+        if self.doc is not None:
+            self.doc._mark_dirty(self)
         # If there is effectively no value (i.e. '') clear out the
         # value
         if not val:
@@ -340,6 +495,8 @@ class SBOLObject:
                 if isinstance(self.properties[property_uri][0], rdflib.URIRef):
                     val = rdflib.URIRef(val)
         self.properties[property_uri][0] = val
+        if self.doc is not None:
+            self.doc._index_references(self, self.properties[property_uri])
 
     def addPropertyValue(self, property_uri, val):
         """Append a value to a user-defined annotation property.
@@ -389,6 +546,16 @@ class SBOLObject:
         raise NotImplementedError("Implemented by child classes")
 
     def build_graph(self, graph):
+        self._build_own_graph(graph)
+        for typeURI, objlist in self.owned_objects.items():
+            if typeURI in self._hidden_properties:
+                continue
+            for owned_obj in objlist:
+                owned_obj.build_graph(graph)
+
+    def _build_own_graph(self, graph):
+        # Add the triples whose subject is this object, without
+        # recursing into the owned objects
         graph.add((rdflib.URIRef(self.identity),
                    rdflib.RDF.type,
                    rdflib.URIRef(self.rdf_type)))
@@ -412,7 +579,6 @@ class SBOLObject:
                 graph.add((rdflib.URIRef(self.identity),
                            rdflib.URIRef(typeURI),
                            URIRef(owned_obj.identity)))
-                owned_obj.build_graph(graph)
 
             # register ownership relationship in SBOL2Serialize to structure XML
             SBOL2Serialize.register_ownership_relation(self.getTypeURI(),
@@ -424,37 +590,20 @@ class SBOLObject:
     def is_top_level(self):
         return False
 
-    def __getattribute__(self, name):
-        # Call the default method
-        result = object.__getattribute__(self, name)
-        if isinstance(result, OwnedObject):
-            if result.getUpperBound() == '1':
-                if result:
-                    result = result[0]
-                else:
-                    result = None
-        elif isinstance(result, Property):
-            # Else if attribute is any other kind of Property besides
-            # OwnedObject, convert so the Property attributes are
-            # transparent and look like native types.
-            result = result.value
-        return result
-
-    def _is_transparent_attribute(self, name):
-        try:
-            attr = self.__dict__[name]
-        except KeyError:
-            return False
-        return isinstance(attr, Property)
-
-    def _set_transparent_attribute(self, name, value):
-        self.__dict__[name].set(value)
-
     def __setattr__(self, name, value):
-        if self._is_transparent_attribute(name):
-            self._set_transparent_attribute(name, value)
-            return
+        if isinstance(value, Property):
+            _PropertyAttribute.install(type(self), name)
         object.__setattr__(self, name, value)
+        if name == 'rdf_type':
+            # rdf_type is a plain attribute, but the digest covers it
+            self._invalidate_hash()
+
+    def _refresh_owned_indexes(self, child):
+        # Called when one of child's lookup keys changes
+        if self._owned_indexes is None:
+            return
+        for index in self._owned_indexes.values():
+            index.refresh(child)
 
     def _added_to_document(self, doc):
         """Classes can override this method to do extra work when
@@ -25,6 +25,117 @@ def sort_version(obj):
     return obj.version
 
 
+# Properties whose values are keys in an _OwnedObjectIndex
+_INDEX_KEY_TYPES = frozenset([SBOL_IDENTITY, SBOL_PERSISTENT_IDENTITY,
+                              SBOL_DISPLAY_ID])
+
+
+class _OwnedObjectIndex:
+    # Lookup tables over the object store of an OwnedObject container.
+    # The index is owned by the SBOLObject holding the store so that
+    # children can refresh their entries when their URIs change.
+
+    def __init__(self, object_store):
+        self.store = object_store
+        self.size = 0
+        self.identities = {}
+        self.persistent_identities = {}
+        self.display_ids = {}
+        self._keys = {}
+        for obj in object_store:
+            self.add(obj)
+
+    @staticmethod
+    def _key(obj, rdf_type):
+        values = obj.properties.get(rdf_type)
+        if not values:
+            return None
+        return str(values[0])
+
+    def add(self, obj):
+        keys = (self._key(obj, SBOL_IDENTITY),
+                self._key(obj, SBOL_PERSISTENT_IDENTITY),
+                self._key(obj, SBOL_DISPLAY_ID))
+        self._keys[obj] = keys
+        identity, persistent_identity, display_id = keys
+        # Like a linear scan, the first object with an identity wins
+        self.identities.setdefault(identity, obj)
+        if persistent_identity is not None:
+            self.persistent_identities.setdefault(persistent_identity,
+                                                  []).append(obj)
+        if display_id is not None:
+            self.display_ids.setdefault(display_id, []).append(obj)
+        self.size += 1
+
+    def discard(self, obj):
+        keys = self._keys.pop(obj, None)
+        if keys is None:
+            return
+        identity, persistent_identity, display_id = keys
+        if self.identities.get(identity) is obj:
+            del self.identities[identity]
+        for table, key in ((self.persistent_identities, persistent_identity),
+                           (self.display_ids, display_id)):
+            if key is None:
+                continue
+            matches = table[key]
+            matches.remove(obj)
+            if not matches:
+                del table[key]
+        self.size -= 1
+
+    def __contains__(self, obj):
+        return obj in self._keys
+
+    def refresh(self, obj):
+        if obj in self._keys:
+            self.discard(obj)
+            self.add(obj)
+
+
+def _uri_state(obj):
+    # The identities and persistentIdentities of obj and its owned
+    # objects, which update_uri() rewrites
+    state = [(obj, obj.identity, obj.persistentIdentity)]
+    for rdf_type, object_store in obj.owned_objects.items():
+        if rdf_type not in obj._hidden_properties:
+            for child in object_store:
+                state.extend(_uri_state(child))
+    return state
+
+
+def _restore_uri_state(state):
+    # Undo update_uri() with a state saved by _uri_state()
+    for obj, identity, persistent_identity in state:
+        if obj.identity != identity:
+            obj.identity = identity
+        if obj.persistentIdentity != persistent_identity:
+            obj.persistentIdentity = persistent_identity
+
+
+# The validation rules of a Property that has none. Shared by all such
+# Properties, so it must never be modified.
+_NO_VALIDATION_RULES = []
+
+# Property class -> the names of all its slots
+_SLOT_NAMES = {}
+
+
+def _slot_names(cls):
+    try:
+        return _SLOT_NAMES[cls]
+    except KeyError:
+        pass
+    names = []
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get('__slots__', ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        names.extend(slot for slot in slots if slot != '__dict__')
+    _SLOT_NAMES[cls] = tuple(names)
+    return _SLOT_NAMES[cls]
+
+
 class Property(ABC):
     """Member properties of all SBOL objects are defined
     using a Property object.
@@ -34,6 +145,11 @@ class Property(ABC):
     into RDF triples.
     """
 
+    # Every SBOL object holds a dozen or more Property instances, so
+    # they are slotted to keep them small.
+    __slots__ = ('_sbol_owner', '_rdf_type', '_lowerBound', '_upperBound',
+                 '_validation_rules')
+
     @staticmethod
     def valid_lower_bound(x: Union[int, float, str]) -> str:
         """Validate the lower bound. Allow numeric strings, ints,
@@ -97,10 +213,10 @@ class Property(ABC):
         self._lowerBound = Property.valid_lower_bound(lower_bound)
         self._upperBound = Property.valid_upper_bound(upper_bound)
         # Validate validation rules
-        if validation_rules is None:
-            # Some constructors pass None for validation rules
-            # Convert to empty list
-            validation_rules = []
+        if not validation_rules:
+            # Some constructors pass None for validation rules.
+            # Share one empty list rather than keep one per Property.
+            validation_rules = _NO_VALIDATION_RULES
         for vr in validation_rules:
             if not callable(vr):
                 raise TypeError('Validation rule %r is not callable' % vr)
@@ -108,6 +224,18 @@ class Property(ABC):
         if initial_value is not None:
             self.value = initial_value
 
+    def _copy_for(self, owner):
+        # Return a Property with the same type, bounds and validation
+        # rules, held by owner. Nothing is put in the owner's stores.
+        prop = object.__new__(type(self))
+        for name in _slot_names(type(self)):
+            setattr(prop, name, getattr(self, name))
+        state = getattr(self, '__dict__', None)
+        if state:
+            prop.__dict__.update(state)
+        prop._sbol_owner = owner
+        return prop
+
     @property
     def logger(self):
         logger = logging.getLogger('sbol2')
@@ -177,6 +305,7 @@ class Property(ABC):
                     self.clear()
                 else:
                     del properties[index]
+                    self._value_changed()
         else:
             self.logger.error("Unable to update property: SBOL owner not set.")
 
@@ -184,6 +313,7 @@ class Property(ABC):
         """Clear all property values."""
         properties = self._sbol_owner.properties[self._rdf_type]
         properties.clear()
+        self._value_changed()
 
     def write(self):
         """Write property values."""
@@ -239,6 +369,23 @@ class Property(ABC):
         else:
             return bool(obj)
 
+    def _value_changed(self):
+        # Let the Document know the owner's triples need regenerating,
+        # and the parent's containers if the owner's lookup keys changed
+        owner = self._sbol_owner
+        owner._invalidate_hash()
+        if owner.doc is not None:
+            owner.doc._mark_dirty(owner)
+        if owner.parent is not None and self._rdf_type in _INDEX_KEY_TYPES:
+            owner.parent._refresh_owned_indexes(owner)
+
+    def _index_references(self):
+        # Let the Document know about URI values written to this property
+        doc = self._sbol_owner.doc
+        if doc is not None:
+            doc._index_references(self._sbol_owner,
+                                  self._sbol_owner.properties[self._rdf_type])
+
     def _isHidden(self):
         return self._rdf_type in self._sbol_owner._hidden_properties
 
@@ -294,6 +441,7 @@ class Property(ABC):
 
 
 class URIProperty(Property):
+    __slots__ = ()
 
     def __init__(self, property_owner, type_uri, lower_bound, upper_bound,
                  validation_rules, initial_value=None):
@@ -336,6 +484,8 @@ class URIProperty(Property):
             self.setSinglePropertyValue(new_value)
         else:
             self.setPropertyValueList(new_value)
+        self._index_references()
+        self._value_changed()
 
     def setSinglePropertyValue(self, new_value):
         new_value = self.convert_from_user(new_value)
@@ -385,6 +535,7 @@ class URIProperty(Property):
 
 
 class LiteralProperty(Property):
+    __slots__ = ()
 
     def __init__(self, property_owner, type_uri, lower_bound, upper_bound,
                  validation_rules=None, initial_value=None):
@@ -424,6 +575,7 @@ class LiteralProperty(Property):
             self.setSinglePropertyValue(new_value)
         else:
             self.setPropertyValueList(new_value)
+        self._value_changed()
 
     def setSinglePropertyValue(self, new_value):
         new_value = self.convert_from_user(new_value)
@@ -455,6 +607,7 @@ class LiteralProperty(Property):
             raise ValueError(msg)
         new_value = self.convert_from_user(new_value)
         property.append(new_value)
+        self._value_changed()
 
     def convert_to_user(self, value):
         return str(value)
@@ -472,6 +625,7 @@ class LiteralProperty(Property):
 
 
 class IntProperty(LiteralProperty):
+    __slots__ = ()
 
     def convert_to_user(self, value):
         return int(value)
@@ -488,6 +642,7 @@ class IntProperty(LiteralProperty):
 
 
 class FloatProperty(LiteralProperty):
+    __slots__ = ()
 
     def convert_to_user(self, value: rdflib.Literal) -> float:
         return float(value)
@@ -507,6 +662,7 @@ class FloatProperty(LiteralProperty):
 
 
 class DateTimeProperty(LiteralProperty):
+    __slots__ = ()
 
     def convert_to_user(self, value):
         return dateutil.parser.parse(value)
@@ -526,6 +682,7 @@ class DateTimeProperty(LiteralProperty):
 
 
 class TextProperty(LiteralProperty):
+    __slots__ = ()
 
     # In the future, pull the convert_to_user and convert_from_user
     # methods out of LiteralProperty and into TextProperty. Then make
@@ -540,6 +697,8 @@ class TextProperty(LiteralProperty):
 
 
 class OwnedObject(Property):
+    __slots__ = ('builder',)
+
     def __init__(self, property_owner, sbol_uri, builder, lower_bound, upper_bound,
                  validation_rules=None, first_object=None):
         """Initialize a container and optionally put the first object in it.
@@ -591,48 +750,89 @@ class OwnedObject(Property):
         return obj
 
     def add(self, sbol_obj):
+        self.add_many([sbol_obj])
+
+    def add_many(self, sbol_objs):
+        """Add a batch of objects to this property.
+
+        The URIs of the whole batch are checked for uniqueness against
+        this property and against each other before any object is
+        stored, so a failed check leaves the property, and the
+        identities, parents and Documents of the objects, unchanged.
+
+        :param sbol_objs: An iterable of SBOL objects
+        :return: None
+        """
         if self._sbol_owner is None:
             # Just silently do nothing?
             return
+        sbol_objs = list(sbol_objs)
+        doc = self._sbol_owner.doc
 
         # If this is a top level object, add it and all its children recursively to the
         # Document. (With some additional refactoring, this could probably all be handled
         # from this method, thus eliminating need for a separate Document adder method)
-        if sbol_obj.is_top_level() and self._sbol_owner.doc is not None:
-            self._sbol_owner.doc.add(sbol_obj)
-            # If a property is hidden, don't return yet, because it still needs to be
-            # added as a child object. (By definition, a hidden owned object can be
-            # accessed from both the Document top level and as a child of another top
-            # level)
-            if not self._isHidden():
-                return
+        if doc is not None:
+            top_levels = [obj for obj in sbol_objs if obj.is_top_level()]
+            if top_levels:
+                doc.add_list(top_levels)
+                # If a property is hidden, don't return yet, because it still needs to be
+                # added as a child object. (By definition, a hidden owned object can be
+                # accessed from both the Document top level and as a child of another top
+                # level)
+                if not self._isHidden():
+                    sbol_objs = [obj for obj in sbol_objs
+                                 if not obj.is_top_level()]
+                    if not sbol_objs:
+                        return
 
         # Not top level, add to the attribute
         object_store = self._sbol_owner.owned_objects[self._rdf_type]
-        if sbol_obj in object_store:
-            raise SBOLError(SBOLErrorCode.SBOL_ERROR_URI_NOT_UNIQUE,
-                            "The object " + sbol_obj.identity +
-                            " is already contained by the " +
-                            self._rdf_type + " property")
-        # Add to Document and check for uniqueness of URI
-        if self._sbol_owner.doc is not None:
-            sbol_obj.doc = self._sbol_owner.doc
-        sbol_obj.parent = self._sbol_owner
-        # Update URI for the argument object and all its children,
-        # if SBOL-compliance is enabled.
-        sbol_obj.update_uri()
-        # Check that this URI is unique within the object store
-        # See issue #127
-        for obj in object_store:
-            if obj.identity == sbol_obj.identity:
-                raise SBOLError(SBOLErrorCode.SBOL_ERROR_URI_NOT_UNIQUE,
-                                "The object " + sbol_obj.identity +
-                                " is already contained by the " +
-                                self._rdf_type + " property")
-        # Add to parent object
-        object_store.append(sbol_obj)
+        index = self._owned_index()
+        batch = {}
+        batch_objs = set()
+        # What the checks below change on each object, so a failed
+        # batch can put it back
+        saved = []
+        try:
+            for sbol_obj in sbol_objs:
+                if sbol_obj in index or sbol_obj in batch_objs:
+                    raise SBOLError(SBOLErrorCode.SBOL_ERROR_URI_NOT_UNIQUE,
+                                    "The object " + sbol_obj.identity +
+                                    " is already contained by the " +
+                                    self._rdf_type + " property")
+                saved.append((sbol_obj, sbol_obj.parent, _uri_state(sbol_obj)))
+                sbol_obj.parent = self._sbol_owner
+                # Update URI for the argument object and all its children,
+                # if SBOL-compliance is enabled.
+                sbol_obj.update_uri()
+                # Check that this URI is unique within the object store
+                # See issue #127
+                identity = str(sbol_obj.identity)
+                if identity in index.identities or identity in batch:
+                    raise SBOLError(SBOLErrorCode.SBOL_ERROR_URI_NOT_UNIQUE,
+                                    "The object " + sbol_obj.identity +
+                                    " is already contained by the " +
+                                    self._rdf_type + " property")
+                batch[identity] = sbol_obj
+                batch_objs.add(sbol_obj)
+        except Exception:
+            for sbol_obj, parent, uri_state in reversed(saved):
+                _restore_uri_state(uri_state)
+                sbol_obj.parent = parent
+            raise
+        # Add to parent object and Document
+        for sbol_obj in batch.values():
+            object_store.append(sbol_obj)
+            index.add(sbol_obj)
+            if doc is not None:
+                sbol_obj.doc = doc
+            if sbol_obj.doc is not None:
+                sbol_obj.doc._index_object(sbol_obj)
+        self._sbol_owner._invalidate_hash()
         # Run validation rules
-        self.validate(sbol_obj)
+        for sbol_obj in batch.values():
+            self.validate(sbol_obj)
 
     def __getitem__(self, id):
         if type(id) is int:
@@ -643,7 +843,29 @@ class OwnedObject(Property):
         errmsg = 'id must be str or int, got {!r}'.format(type(id))
         raise TypeError(errmsg)
 
+    def _materialize(self):
+        # A lazily read Document builds the objects of this type
+        # before they are used
+        if self._sbol_owner._lazy is not None:
+            self._sbol_owner._materialize_type(self._rdf_type)
+
+    def _owned_index(self):
+        # Return the lookup tables for this container, rebuilding them
+        # if the object store was replaced or resized behind our back
+        self._materialize()
+        object_store = self._sbol_owner.owned_objects[self._rdf_type]
+        indexes = self._sbol_owner._owned_indexes
+        if indexes is None:
+            indexes = self._sbol_owner._owned_indexes = {}
+        index = indexes.get(self._rdf_type)
+        if (index is None or index.store is not object_store
+                or index.size != len(object_store)):
+            index = _OwnedObjectIndex(object_store)
+            indexes[self._rdf_type] = index
+        return index
+
     def get_int(self, id):
+        self._materialize()
         object_store = self._sbol_owner.owned_objects[self._rdf_type]
         if id >= len(object_store):
             # Note: for loops expect an IndexError to be
@@ -664,6 +886,15 @@ class OwnedObject(Property):
         raise TypeError(errmsg)
 
     def get_uri(self, id):
+        """Look up an object in this container.
+
+        id is matched against, in turn, the identities of the objects,
+        their persistentIdentities and their displayIds. Each is an
+        exact match, so a persistentIdentity finds the newest version
+        of that object, but a prefix of one finds nothing.
+
+        :raises: SBOLError with NOT_FOUND_ERROR if no object matches
+        """
         id = str(id)
         if Config.getOption(ConfigOptions.VERBOSE.value) is True:
             print('SBOL compliant URIs are set to ' +
@@ -671,17 +902,28 @@ class OwnedObject(Property):
             print('SBOL typed URIs are set to ' +
                   Config.getOption(ConfigOptions.SBOL_TYPED_URIS.value))
             print('Searching for ' + id)
-        # Search this property's object store for the uri
-        object_store = self._sbol_owner.owned_objects[self._rdf_type]
-        for obj in object_store:
-            if id == obj.identity:
+        if self._sbol_owner._lazy is not None:
+            # Build just this object if it is a pending TopLevel
+            obj = self._sbol_owner._lazy_get(self._rdf_type, id)
+            if obj is not None:
                 return obj
+        # Search this property's object store for the uri
+        index = self._owned_index()
+        obj = index.identities.get(id)
+        if obj is not None:
+            return obj
+        # Every search below only matches objects indexed under id
+        if id not in index.persistent_identities and id not in index.display_ids:
+            msg = 'Object {} not found'.format(id)
+            raise SBOLError(SBOLErrorCode.NOT_FOUND_ERROR, msg)
         # Now assume the search string is a persistent identity
         obj = self.find_persistent_identity(id)
         if obj is not None:
             return obj
         # If searching by the full URI fails, assume the user is searching
-        # for an SBOL-compliant URI using the displayId only
+        # for an SBOL-compliant URI using the displayId only. Only objects
+        # with that displayId can have such a URI.
+        object_store = index.display_ids.get(id, [])
         # Form compliant URI for child object
         parent_obj = self._sbol_owner
         resource_namespaces = []
@@ -710,16 +952,16 @@ class OwnedObject(Property):
         # Search for persistent identity, returning the newest version
         # Similar to the looping in find_resource, but we can do it better
         # if a match, store it. If another match, check versions and keep
-        # the newer one.
+        # the newer one. The index narrows the search to objects with
+        # this persistent identity.
         found_object = None
         found_version = pv.NegativeInfinity
-        object_store = self._sbol_owner.owned_objects[self._rdf_type]
-        for obj in object_store:
-            if obj.identity.startswith(search_uri):
-                obj_version = pv.parse(obj.version)
-                if obj_version > found_version:
-                    found_object = obj
-                    found_version = obj_version
+        index = self._owned_index()
+        for obj in index.persistent_identities.get(str(search_uri), []):
+            obj_version = pv.parse(obj.version)
+            if obj_version > found_version:
+                found_object = obj
+                found_version = obj_version
         return found_object
 
     def find_resource(self, uri, resource_namespaces, object_store,
@@ -743,9 +985,9 @@ class OwnedObject(Property):
             for obj in object_store:
                 if compliant_uri in obj.identity:
                     persistent_id_matches.append(obj)
-                # Sort objects with same persistentIdentity by version
-                # TODO is this right?
-                persistent_id_matches.sort(key=sort_version)
+            # Sort objects with same persistentIdentity by version
+            # TODO is this right?
+            persistent_id_matches.sort(key=sort_version)
             # If objects matching the persistentIdentity were found,
             # return the most recent version
             if len(persistent_id_matches) > 0:
@@ -769,6 +1011,7 @@ class OwnedObject(Property):
     def get(self, uri=''):
         # TODO: orig getter contains a size check when uri is a constant string
         if uri == '':
+            self._materialize()
             object_store = self._sbol_owner.owned_objects[self._rdf_type]
             if object_store:
                 return object_store[0]
@@ -791,6 +1034,7 @@ class OwnedObject(Property):
         # Add to parent object
         if len(self._sbol_owner.owned_objects[rdf_type]) == 0:
             self._sbol_owner.owned_objects[rdf_type].append(sbol_obj)
+            self._sbol_owner._invalidate_hash()
         else:
             raise SBOLError(SBOLErrorCode.SBOL_ERROR_INVALID_ARGUMENT,
                             "Cannot set " + parsePropertyName(rdf_type) +
@@ -801,6 +1045,9 @@ class OwnedObject(Property):
         # Update URI for the argument object and all its children,
         # if SBOL-compliance is enabled.
         sbol_obj.update_uri()
+        if self._sbol_owner.doc is not None:
+            sbol_obj.doc = self._sbol_owner.doc
+            sbol_obj.doc._index_object(sbol_obj)
 
         # Run validation rules
         self.validate(sbol_obj)
@@ -856,7 +1103,7 @@ class OwnedObject(Property):
             if value is not None:
                 self.remove(value.identity)
             return
-        self._sbol_owner.owned_objects[self._rdf_type].clear()
+        self._clear_object_store()
         self.add(new_value)
 
     def setPropertyValueList(self, new_value):
@@ -864,10 +1111,21 @@ class OwnedObject(Property):
         #
         # TODO: This can leave the attribute empty if `add` fails.
         # Can we capture that and sent the old value back again?
-        self._sbol_owner.owned_objects[self._rdf_type].clear()
+        self._clear_object_store()
         for nv in new_value:
             self.add(nv)
 
+    def _clear_object_store(self):
+        # Empty the object store without touching the Document's
+        # TopLevel registry, keeping the Document's identity index in sync.
+        self._materialize()
+        object_store = self._sbol_owner.owned_objects[self._rdf_type]
+        for obj in object_store:
+            if obj.doc is not None:
+                obj.doc._unindex_object(obj)
+        object_store.clear()
+        self._sbol_owner._invalidate_hash()
+
     def remove(self, identifier):
         """id can be either an integer index or a string URI"""
         if type(identifier) is int:
@@ -882,6 +1140,7 @@ class OwnedObject(Property):
 
     def removeOwnedObject_int(self, index):
         if self._sbol_owner is not None:
+            self._materialize()
             if self._rdf_type in self._sbol_owner.owned_objects:
                 object_store = self._sbol_owner.owned_objects[self._rdf_type]
                 if index >= len(object_store):
@@ -890,7 +1149,12 @@ class OwnedObject(Property):
                 obj = object_store[index]
                 if self._sbol_owner.getTypeURI() == SBOL_DOCUMENT:
                     del obj.doc.SBOLObjects[rdflib.URIRef(obj.identity)]
+                owned_index = self._owned_index()
                 del object_store[index]
+                owned_index.discard(obj)
+                self._sbol_owner._invalidate_hash()
+                if obj.doc is not None:
+                    obj.doc._unindex_object(obj)
                 obj.doc = None
                 self.validate(None)
                 return obj
@@ -903,24 +1167,35 @@ class OwnedObject(Property):
             return
         obj = self.find(uri)
         object_store = self._sbol_owner.owned_objects[self._rdf_type]
+        index = self._owned_index()
         object_store.remove(obj)
+        index.discard(obj)
+        self._sbol_owner._invalidate_hash()
         # Erase TopLevel objects from Document
         if self._sbol_owner.rdf_type == SBOL_DOCUMENT:
             del obj.doc.SBOLObjects[obj.identity]
+        if obj.doc is not None:
+            obj.doc._unindex_object(obj)
         obj.doc = None
         self.validate(None)
         return obj
 
     def clear(self):
         if self._sbol_owner is not None:
+            self._materialize()
             if self._rdf_type in self._sbol_owner.owned_objects:
                 object_store = self._sbol_owner.owned_objects[self._rdf_type]
                 for obj in object_store:
-                    if obj.is_top_level() and obj.doc is not None:
-                        obj.doc.SBOLObjects.remove(obj.identity)
+                    if obj.doc is None:
+                        continue
+                    if obj.is_top_level() and obj.identity in obj.doc.SBOLObjects:
+                        del obj.doc.SBOLObjects[obj.identity]
+                    obj.doc._unindex_object(obj)
                 object_store.clear()
+                self._sbol_owner._invalidate_hash()
 
     def __len__(self):
+        self._materialize()
         if self._rdf_type not in self._sbol_owner.owned_objects:
             return 0
         else:
@@ -929,6 +1204,8 @@ class OwnedObject(Property):
 
 
 class ReferencedObject(URIProperty):
+    __slots__ = ('reference_type_uri',)
+
     def __init__(self, property_owner, type_uri, reference_type_uri,
                  lower_bound, upper_bound, validation_rules,
                  initial_value=None):
@@ -957,6 +1234,8 @@ class ReferencedObject(URIProperty):
             self.setSinglePropertyValue(new_value)
         else:
             self.setPropertyValueList(new_value)
+        self._index_references()
+        self._value_changed()
 
     def _to_uri(self, obj):
         """Converts strings, URIRefs, and sbol.Identified instances into
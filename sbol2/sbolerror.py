@@ -36,3 +36,13 @@ class SBOLError(Exception):
 
     def error_code(self):
         return self._err
+
+
+class SBOLOverwriteError(SBOLError):
+    """Raised when adding SBOL data to a Document would overwrite
+    objects already in it. uris lists the identities of all of them."""
+
+    def __init__(self, uris):
+        self.uris = [str(uri) for uri in uris]
+        message = ', '.join(self.uris) + ' would require overwriting'
+        super().__init__(SBOLErrorCode.DUPLICATE_URI_ERROR, message)
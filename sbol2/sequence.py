@@ -97,16 +97,43 @@ class Sequence(TopLevel):
         raise NotImplementedError("Not yet implemented")
 
     def compile(self, composite_sequence='', assembly_method=None):
+        # composite_sequence is the sequence assembled so far by the
+        # callers up the hierarchy. Only its length is used, to place
+        # the Ranges of this Sequence's subcomponents.
+        return self._compile_node(len(composite_sequence), assembly_method)[0]
+
+    def _parent_component_definition(self):
+        # The first ComponentDefinition in the Document whose sequence
+        # is this one. Candidates come from the Document's referrers
+        # index, which misses references written straight into a
+        # properties store, so fall back to a scan.
+        candidates = [obj for obj in self.doc.referrers(self.identity)
+                      if str(obj.getTypeURI()) == SBOL_COMPONENT_DEFINITION]
+        if not candidates:
+            candidates = self.doc.componentDefinitions
+        matches = [cd for cd in candidates
+                   if cd.sequence and cd.sequence.identity == self.identity]
+        if not matches:
+            return None
+        if len(matches) > 1:
+            # Shared by several, so keep to the Document's order
+            cds = self.doc.owned_objects[SBOL_COMPONENT_DEFINITION]
+            return min(matches, key=cds.index)
+        return matches[0]
+
+    def _compile_node(self, offset, assembly_method=None):
+        # offset is the length of the sequence assembled so far up the
+        # hierarchy. Subsequences are collected in a list and joined
+        # once, so each level copies its own sequence a single time.
+        # Returns the compiled sequence and, unless this Sequence
+        # belongs to a ComponentDefinition without components, its
+        # _CompiledSequence.
         if not self.doc:
             raise ValueError('Cannot compile Sequence <%s>. The Sequence must belong to '
                              'a Document in order to compile.' % self.identity)
 
         # Search for the parent ComponentDefinition to which this Sequence belongs
-        parent_cdef = None
-        for cd in self.doc.componentDefinitions:
-            if cd.sequence and cd.sequence.identity == self.identity:
-                parent_cdef = cd
-                break
+        parent_cdef = self._parent_component_definition()
 
         if not parent_cdef:
             raise ValueError('Cannot compile Sequence <%s>. The Sequence must be '
@@ -115,15 +142,33 @@ class Sequence(TopLevel):
 
         if len(parent_cdef.components) == 0:
             if parent_cdef.sequence.elements:
-                return parent_cdef.sequence.elements
+                return parent_cdef.sequence.elements, None
             else:
-                return ''  # Maybe this should raise an Exception ?
+                return '', None  # Maybe this should raise an Exception ?
 
         elif len(parent_cdef.components) > 0:
+            # Reuse the last compilation of this ComponentDefinition if
+            # nothing it depends on has changed since
+            cache = self.doc._compile_cache
+            key = (str(parent_cdef.identity), str(parent_cdef.version))
+            compiled = cache.get(key)
+            if (assembly_method is None and compiled is not None
+                    and compiled.is_current(parent_cdef, self)):
+                compiled.place(offset)
+                return compiled.elements, compiled
+            compiled = _CompiledSequence(parent_cdef, self)
+
             # Recurse into subcomponents and assemble their sequence
-            composite_sequence_initial_size = len(composite_sequence)
+            fragments = []
+            position = offset
 
             subcomponents = parent_cdef.getPrimaryStructureComponents()
+            # The objects that refer to each Component, looked up once
+            # for all the subcomponents
+            annotations = {}
+            _index_property_values(parent_cdef, SBOL_COMPONENT_PROPERTY, annotations)
+            # The next instance number to try for each annotation id
+            sa_instances = {}
             for c in subcomponents:
                 cdef = self.doc.getComponentDefinition(c.definition)
                 if not cdef.sequence:
@@ -139,8 +184,7 @@ class Sequence(TopLevel):
 
                 # Check for regularity -- only one SequenceAnnotation per Component is
                 # allowed
-                sequence_annotations = \
-                    parent_cdef.find_property_value(SBOL_COMPONENT_PROPERTY, c.identity)
+                sequence_annotations = list(annotations.get(str(c.identity), ()))
 
                 if len(sequence_annotations) > 1:
                     raise SBOLError(SBOLErrorCode.SBOL_ERROR_INVALID_ARGUMENT,
@@ -151,12 +195,14 @@ class Sequence(TopLevel):
                 # Auto-construct a SequenceAnnotation for this Component if one doesn't
                 # already exist
                 if len(sequence_annotations) == 0:
-                    sa_instance = 0
                     if Config.getOption(ConfigOptions.SBOL_COMPLIANT_URIS):
                         sa_id = cdef.displayId
                     else:
                         sa_id = cdef.identity
                     sa_id += '_annotation'
+                    # Instances only ever get taken, so the search for a
+                    # free one picks up where the last one ended
+                    sa_instance = sa_instances.get(sa_id, 0)
                     sa_uri = '%s/%s_%d/%s' % (parent_cdef.persistentIdentity, sa_id,
                                               sa_instance, cdef.version)
                     while sa_uri in parent_cdef.sequenceAnnotations:
@@ -165,6 +211,7 @@ class Sequence(TopLevel):
                                                   sa_instance, cdef.version)
                     sa = parent_cdef.sequenceAnnotations.create('%s_%d' % (sa_id,
                                                                 sa_instance))
+                    sa_instances[sa_id] = sa_instance + 1
                     sa.component = c
                     sequence_annotations.append(sa)
 
@@ -177,7 +224,7 @@ class Sequence(TopLevel):
                 for loc in sa.locations:
                     if type(loc) is Range:
                         ranges.append(loc)
-                else:
+                if not ranges:
                     # Auto-construct a Range
                     if Config.getOption(ConfigOptions.SBOL_COMPLIANT_URIS):
                         range_id = sa.displayId
@@ -192,8 +239,9 @@ class Sequence(TopLevel):
                                     % (self.identity, sa.identity))
 
                 r = ranges[0]
-                r.start = len(composite_sequence) + 1
-                subsequence = seq.compile(composite_sequence)  # Recursive call
+                r.start = position + 1
+                # Recursive call
+                subsequence, compiled_part = seq._compile_node(position)
                 if assembly_method:
                     subsequence = assembly_method(subsequence)
                     if not type(subsequence) is str:
@@ -205,12 +253,124 @@ class Sequence(TopLevel):
                 if len(c.sourceLocations) == 1:
                     source_loc = c.sourceLocations.getRange()
                     subsequence = subsequence[(source_loc.start - 1):source_loc.end]
-                composite_sequence = composite_sequence + subsequence
-                r.end = len(composite_sequence)
+                fragments.append(subsequence)
+                compiled.add_part(cdef, seq, compiled_part, position - offset)
+                compiled.ranges.append((r, position - offset + 1,
+                                        position - offset + len(subsequence)))
+                position += len(subsequence)
+                r.end = position
 
-            composite_sequence_current_size = composite_sequence_initial_size \
-                + len(composite_sequence)
-            subsequence = composite_sequence[composite_sequence_initial_size:
-                                             composite_sequence_current_size]
+            subsequence = ''.join(fragments)
             self.elements = subsequence
-            return subsequence
+            if assembly_method is None:
+                compiled.finish(subsequence)
+                cache[key] = compiled
+            return subsequence, compiled
+
+
+def _index_property_values(obj, property_uri, index):
+    # Add obj and the objects it owns, recursively, to index, which
+    # maps each value of the given property to the objects holding it.
+    # The objects are listed in the order find_property_value() would
+    # return them.
+    for rdf_type, object_store in obj.owned_objects.items():
+        if rdf_type in obj._hidden_properties:
+            continue
+        for child in object_store:
+            _index_property_values(child, property_uri, index)
+    for value in obj.properties.get(property_uri, ()):
+        index.setdefault(str(value), []).append(obj)
+
+
+def _compile_state(cdef):
+    # What compiling a ComponentDefinition depends on, apart from the
+    # ComponentDefinitions and Sequences of its parts. The digests of
+    # the components cover their definitions and sourceLocations.
+    # Compiling moves the Ranges of the SequenceAnnotations, so only
+    # the Components and locations they point at are looked at.
+    owned_objects = cdef.owned_objects
+    return (tuple(c._structural_hash()
+                  for c in owned_objects.get(SBOL_COMPONENTS, ())),
+            tuple(sc._structural_hash()
+                  for sc in owned_objects.get(SBOL_SEQUENCE_CONSTRAINTS, ())),
+            tuple((str(sa.identity),
+                   tuple(sa.properties.get(SBOL_COMPONENT_PROPERTY, ())),
+                   tuple(str(loc.identity)
+                         for loc in sa.owned_objects.get(SBOL_LOCATIONS, ())))
+                  for sa in owned_objects.get(SBOL_SEQUENCE_ANNOTATIONS, ())),
+            tuple(cdef.properties.get(SBOL_SEQUENCE_PROPERTY, ())))
+
+
+def _elements_value(sequence):
+    # The stored elements of a Sequence. Setting the elements stores a
+    # new value, so comparing these by identity detects any change.
+    values = sequence.properties.get(SBOL_ELEMENTS)
+    return values[0] if values else None
+
+
+class _CompiledSequence:
+    # The compiled Sequence of a ComponentDefinition with components,
+    # kept in the Document's compile cache, keyed by the identity and
+    # version of the ComponentDefinition, so that a subassembly shared
+    # by many designs is compiled once
+
+    def __init__(self, cdef, sequence):
+        self.cdef = cdef
+        self.sequence = sequence
+        # Taken once compiling has added its SequenceAnnotations
+        self.state = None
+        self.elements = ''
+        self.elements_value = None
+        # (Range, start, end) of each part, relative to this sequence
+        self.ranges = []
+        # (ComponentDefinition, its sequences, Sequence, elements value,
+        # _CompiledSequence or None, position) of each part
+        self.parts = []
+
+    def add_part(self, cdef, sequence, compiled, position):
+        self.parts.append((cdef, tuple(cdef.properties.get(SBOL_SEQUENCE_PROPERTY, ())),
+                           sequence, _elements_value(sequence), compiled, position))
+
+    def finish(self, elements):
+        self.state = _compile_state(self.cdef)
+        self.elements = elements
+        self.elements_value = _elements_value(self.sequence)
+
+    def is_current(self, cdef, sequence):
+        # Whether compiling cdef again would give the same result
+        if self.cdef is not cdef or self.sequence is not sequence:
+            return False
+        if _elements_value(sequence) is not self.elements_value:
+            return False
+        if _compile_state(cdef) != self.state:
+            return False
+        index = cdef.doc._identity_index
+        for r, _, _ in self.ranges:
+            if index.get(str(r.identity)) is not r:
+                return False
+        for part_cdef, sequences, part_sequence, value, compiled, _ in self.parts:
+            if (index.get(str(part_cdef.identity)) is not part_cdef
+                    or index.get(str(part_sequence.identity)) is not part_sequence
+                    or _elements_value(part_sequence) is not value
+                    or tuple(part_cdef.properties.get(SBOL_SEQUENCE_PROPERTY, ()))
+                    != sequences):
+                return False
+            if compiled is None:
+                if part_cdef.owned_objects.get(SBOL_COMPONENTS):
+                    return False
+            elif not compiled.is_current(compiled.cdef, compiled.sequence):
+                return False
+        return True
+
+    def place(self, offset):
+        # Move the Ranges of the parts, here and in the parts' own
+        # compiled sequences, to a sequence starting after offset bases
+        for r, start, end in self.ranges:
+            if r.start != start + offset:
+                r.start = start + offset
+            if r.end != end + offset:
+                r.end = end + offset
+        for part in self.parts:
+            compiled = part[4]
+            if compiled is not None:
+                compiled.place(offset + part[5])
@@ -1,20 +1,47 @@
-import collections
 from typing import Any
 
 
-class URIDict(collections.UserDict):
+class URIDict(dict):
+    """A dict keyed by plain strings.
 
-    def __init__(self):
+    rdflib.URIRef does not compare equal to a str with the same
+    characters, so keys are converted to str on the way in.
+    Subclassing dict rather than collections.UserDict keeps the lookup
+    itself in C.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
         super().__init__()
+        self.update(*args, **kwargs)
 
     def __getitem__(self, key: str) -> Any:
-        return super().__getitem__(str(key))
+        return dict.__getitem__(self, str(key))
 
     def __setitem__(self, key: str, value: Any) -> None:
-        super().__setitem__(str(key), value)
+        dict.__setitem__(self, str(key), value)
 
     def __delitem__(self, key: str) -> None:
-        super().__delitem__(str(key))
+        dict.__delitem__(self, str(key))
 
     def __contains__(self, key: str) -> bool:
-        return super().__contains__(str(key))
+        return dict.__contains__(self, str(key))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return dict.get(self, str(key), default)
+
+    def pop(self, key: str, *args) -> Any:
+        return dict.pop(self, str(key), *args)
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        return dict.setdefault(self, str(key), default)
+
+    def update(self, *args, **kwargs) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def copy(self) -> 'URIDict':
+        result = URIDict()
+        dict.update(result, self)
+        return result
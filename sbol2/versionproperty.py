@@ -4,6 +4,7 @@ import rdflib
 
 
 class VersionProperty(LiteralProperty):
+    __slots__ = ()
 
     def convert_to_user(self, value):
         result = str(value)
@@ -286,6 +286,45 @@ class TestAssemblyRoutines(unittest.TestCase):
         self.assertEqual(cd_root.getPrimaryStructureComponents(), [c0, c1, c2])
         self.assertEqual(cd_root.getPrimaryStructure(), [cd0, cd1, cd2])
 
+    def test_primary_structure_not_linear(self):
+        # Test that branches and cycles in the SequenceConstraints
+        # are reported
+        doc = sbol2.Document()
+        cd_root = doc.componentDefinitions.create('root')
+        c0 = cd_root.components.create('c0')
+        c1 = cd_root.components.create('c1')
+        c2 = cd_root.components.create('c2')
+        sc0 = cd_root.sequenceConstraints.create('sc0')
+        sc1 = cd_root.sequenceConstraints.create('sc1')
+        sc0.subject = c0
+        sc0.object = c1
+        sc1.subject = c0
+        sc1.object = c2
+        with self.assertRaises(ValueError) as err:
+            cd_root.getPrimaryStructureComponents()
+        self.assertIn('precedes both', str(err.exception))
+        sc1.subject = c1
+        sc1.object = c0
+        with self.assertRaises(ValueError) as err:
+            cd_root.getPrimaryStructureComponents()
+        self.assertIn('cycle', str(err.exception))
+        with self.assertRaises(ValueError):
+            cd_root.getFirstComponent()
+        sc1.subject = c2
+        self.assertEqual(cd_root.getPrimaryStructureComponents(), [c2, c0, c1])
+        # Two separate chains, c0 -> c1 and c2 -> c3, with a constraint
+        # that is not a precedes to make up the count
+        c3 = cd_root.components.create('c3')
+        sc1.subject = c2
+        sc1.object = c3
+        sc2 = cd_root.sequenceConstraints.create('sc2')
+        sc2.subject = c1
+        sc2.object = c3
+        sc2.restriction = sbol2.SBOL_RESTRICTION_SAME_ORIENTATION_AS
+        with self.assertRaises(ValueError) as err:
+            cd_root.getPrimaryStructureComponents()
+        self.assertIn('not linked', str(err.exception))
+
     def test_assemble(self):
         doc = sbol2.Document()
         gene = sbol2.ComponentDefinition("BB0001")
@@ -409,6 +448,95 @@ class TestAssemblyRoutines(unittest.TestCase):
         self.assertEqual(r4.start, 1)
         self.assertEqual(r4.end, 2)
 
+    def test_compile_shared_subassembly(self):
+        # Test compiling designs that share a subassembly, and compiling
+        # again after its parts change
+        doc = sbol2.Document()
+        cd1 = doc.componentDefinitions.create('cd1')
+        cd2 = doc.componentDefinitions.create('cd2')
+        cd1.sequence = sbol2.Sequence('cd1', 'tt')
+        cd2.sequence = sbol2.Sequence('cd2', 'gg')
+        sub = doc.componentDefinitions.create('sub')
+        sub.assemblePrimaryStructure([cd1, cd2])
+        design1 = doc.componentDefinitions.create('design1')
+        design2 = doc.componentDefinitions.create('design2')
+        design1.assemblePrimaryStructure([cd1, sub])
+        design2.assemblePrimaryStructure([sub, cd2])
+        self.assertEqual(design1.compile(), 'ttttgg')
+        self.assertEqual(design2.compile(), 'ttgggg')
+        # Ranges follow the last compiled design
+        r = sub.sequenceAnnotations['cd2_annotation_0'].locations[0]
+        self.assertEqual((r.start, r.end), (3, 4))
+        self.assertEqual(design1.compile(), 'ttttgg')
+        self.assertEqual((r.start, r.end), (5, 6))
+        cd2.sequence.elements = 'ccc'
+        self.assertEqual(design1.compile(), 'ttttccc')
+        self.assertEqual(sub.sequence.elements, 'ttccc')
+        self.assertEqual((r.start, r.end), (5, 7))
+        c = sub.components['cd1_0']
+        c.sourceLocations.createRange('source')
+        c.sourceLocations[0].end = 1
+        self.assertEqual(design2.compile(), 'tcccccc')
+
+    def test_compile_retargeted_annotation(self):
+        # Test compiling again after the SequenceAnnotations of a
+        # subassembly are pointed at each other's Components
+        doc = sbol2.Document()
+        cd1 = doc.componentDefinitions.create('cd1')
+        cd2 = doc.componentDefinitions.create('cd2')
+        cd1.sequence = sbol2.Sequence('cd1', 'tt')
+        cd2.sequence = sbol2.Sequence('cd2', 'ggg')
+        sub = doc.componentDefinitions.create('sub')
+        sub.assemblePrimaryStructure([cd1, cd2])
+        design = doc.componentDefinitions.create('design')
+        design.assemblePrimaryStructure([cd1, sub])
+        self.assertEqual(design.compile(), 'ttttggg')
+        self.assertEqual(design.compile(), 'ttttggg')
+        sa1 = sub.sequenceAnnotations['cd1_annotation_0']
+        sa2 = sub.sequenceAnnotations['cd2_annotation_0']
+        sa1.component, sa2.component = sa2.component, sa1.component
+        self.assertEqual(design.compile(), 'ttttggg')
+        r1 = sa1.locations[0]
+        r2 = sa2.locations[0]
+        self.assertEqual((r1.start, r1.end), (5, 7))
+        self.assertEqual((r2.start, r2.end), (3, 4))
+
+    def test_compile_reused_part(self):
+        # Test that a part used many times gets one SequenceAnnotation
+        # per Component, skipping ids that are already taken
+        doc = sbol2.Document()
+        cd1 = doc.componentDefinitions.create('cd1')
+        cd1.sequence = sbol2.Sequence('cd1', 'at')
+        design = doc.componentDefinitions.create('design')
+        design.assemblePrimaryStructure([cd1, cd1, cd1, cd1])
+        design.sequenceAnnotations.create('cd1_annotation_1')
+        self.assertEqual(design.compile(), 'atatatat')
+        annotated = {}
+        for sa in design.sequenceAnnotations:
+            if sa.component is not None:
+                annotated[sa.displayId] = sa.locations[0].start
+        self.assertEqual(annotated, {'cd1_annotation_0': 1,
+                                     'cd1_annotation_2': 3,
+                                     'cd1_annotation_3': 5,
+                                     'cd1_annotation_4': 7})
+        # Compiling again reuses the same annotations
+        self.assertEqual(design.compile(), 'atatatat')
+        self.assertEqual(len(design.sequenceAnnotations), 5)
+
+    def test_compile_untracked_sequence(self):
+        # Test compiling when a sequence reference was written straight
+        # into the properties store, out of sight of the Document's
+        # referrers index
+        doc = sbol2.Document()
+        cd1 = doc.componentDefinitions.create('cd1')
+        cd1.sequence = sbol2.Sequence('cd1', 'tt')
+        cd2 = doc.componentDefinitions.create('cd2')
+        seq = doc.sequences.create('cd2')
+        cd2.properties[sbol2.SBOL_SEQUENCE_PROPERTY] = [rdflib.URIRef(seq.identity)]
+        cd2.assemblePrimaryStructure([cd1, cd1])
+        self.assertEqual(seq.compile(), 'tttt')
+        self.assertEqual(cd2.sequence.elements, 'tttt')
+
     def test_standard_assembly(self):
         doc = sbol2.Document()
         gene = sbol2.ComponentDefinition("BB0001")
@@ -1,11 +1,14 @@
 import io
 import locale
 import os
+import pathlib
+import pickle
 import tempfile
 import unittest
 import unittest.mock
 
 import rdflib
+import rdflib.compare
 
 import sbol2
 import sbol2 as sbol
@@ -18,6 +21,24 @@ CRISPR_LOCATION = TEST_LOCATION
 ANNO_LOCATION = os.path.join(MODULE_LOCATION, 'SBOLTestSuite', 'SBOL2',
                              'AnnotationOutput.xml')
 
+ANNOTATION_XML = '''<?xml version="1.0" encoding="utf-8"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:sbol="http://sbols.org/v2#"
+         xmlns:pr="http://partsregistry.org/">
+  <sbol:ComponentDefinition rdf:about="http://examples.org/cd/1">
+    <sbol:displayId>cd</sbol:displayId>
+    <sbol:persistentIdentity rdf:resource="http://examples.org/cd"/>
+    <sbol:version>1</sbol:version>
+    <sbol:type rdf:resource="http://www.biopax.org/release/biopax-level3.owl#DnaRegion"/>
+    <pr:information>
+      <pr:Information rdf:about="http://examples.org/cd/information">
+        <pr:sigmafactor>//rnap/prokaryote/ecoli/sigma70</pr:sigmafactor>
+      </pr:Information>
+    </pr:information>
+  </sbol:ComponentDefinition>
+</rdf:RDF>
+'''
+
 
 class TestDocument(unittest.TestCase):
 
@@ -27,10 +48,13 @@ class TestDocument(unittest.TestCase):
         # tearDown(). It would be nice to have a method to reset to
         # factory configuration.
         self.validator_url = sbol2.Config.getOption(sbol2.ConfigOptions.VALIDATOR_URL)
+        # Likewise for tests that turn validation off to write files
+        self.validate = sbol2.Config.getOption(sbol2.ConfigOptions.VALIDATE)
 
     def tearDown(self):
         sbol2.Config.setOption(sbol2.ConfigOptions.VALIDATOR_URL,
                                self.validator_url)
+        sbol2.Config.setOption(sbol2.ConfigOptions.VALIDATE, self.validate)
 
     def test_empty_len0(self):
         doc = sbol.Document()
@@ -161,6 +185,33 @@ class TestDocument(unittest.TestCase):
         self.assertNotEqual(found, -1)
         self.assertIsNotNone(found)
 
+    def test_find_child_objects(self):
+        # Document.find uses an identity index. Make sure the index
+        # tracks child objects as they are added and removed.
+        sbol.setHomespace('http://examples.org')
+        sbol.Config.setOption(sbol2.ConfigOptions.SBOL_COMPLIANT_URIS, True)
+        sbol.Config.setOption(sbol2.ConfigOptions.SBOL_TYPED_URIS, False)
+        doc = sbol.Document()
+        cd = doc.componentDefinitions.create('cd')
+        sa = cd.sequenceAnnotations.create('sa')
+        r = sa.locations.createRange('r')
+        self.assertIs(doc.find(cd.identity), cd)
+        self.assertIs(doc.find(sa.identity), sa)
+        self.assertIs(doc.find(r.identity), r)
+        cd.sequenceAnnotations.remove(sa.identity)
+        self.assertIsNone(doc.find(sa.identity))
+        self.assertIsNone(doc.find(r.identity))
+        doc.componentDefinitions.remove(cd.identity)
+        self.assertIsNone(doc.find(cd.identity))
+        # Parsed child objects are found too
+        doc2 = sbol.Document(TEST_LOCATION)
+        uri = 'http://sbols.org/CRISPR_Example/CRISPR_Template/cas9_gRNA_complex/1.0.0'
+        found = doc2.find(uri)
+        self.assertIsNotNone(found)
+        self.assertEqual(uri, found.identity)
+        doc2.clear()
+        self.assertIsNone(doc2.find(uri))
+
     def test_lookup(self):
         # Test simple key lookup via the __getitem__() method
         doc = sbol.Document()
@@ -386,6 +437,70 @@ class TestDocument(unittest.TestCase):
         self.assertEqual(info.getPropertyValue(regulation_uri),
                          '//regulation/constitutive')
 
+    def test_read_annotations_string(self):
+        # Nested annotation objects are attached to their referrer
+        doc = sbol2.Document()
+        doc.readString(ANNOTATION_XML)
+        cd = doc.componentDefinitions['http://examples.org/cd/1']
+        info_uri = rdflib.URIRef('http://partsregistry.org/information')
+        self.assertNotIn(info_uri, cd.properties)
+        info = cd.owned_objects[info_uri][0]
+        self.assertEqual('http://examples.org/cd/information', info.identity)
+        self.assertIs(info.parent, cd)
+
+    def test_referrers(self):
+        sbol.setHomespace('http://examples.org')
+        sbol.Config.setOption(sbol2.ConfigOptions.SBOL_COMPLIANT_URIS, True)
+        sbol.Config.setOption(sbol2.ConfigOptions.SBOL_TYPED_URIS, False)
+        doc = sbol.Document()
+        cd = doc.componentDefinitions.create('cd')
+        part = doc.componentDefinitions.create('part')
+        c = cd.components.create('c')
+        self.assertNotIn(c, doc.referrers(part.identity))
+        c.definition = part
+        self.assertIn(c, doc.referrers(part.identity))
+        self.assertEqual(doc.find_reference(rdflib.URIRef(part.identity)),
+                         doc.referrers(part.identity))
+        # Ontology terms are references too
+        cd.roles = [sbol.SO_PROMOTER]
+        self.assertEqual([cd], doc.referrers(sbol.SO_PROMOTER))
+        cd.roles = []
+        self.assertEqual([], doc.referrers(sbol.SO_PROMOTER))
+        # Removed objects no longer refer to anything
+        cd.components.remove(c.identity)
+        self.assertNotIn(c, doc.referrers(part.identity))
+        # References survive a round trip
+        doc2 = sbol.Document()
+        doc2.readString(doc.writeString())
+        part2 = doc2.componentDefinitions[part.identity]
+        cd2 = doc2.componentDefinitions[cd.identity]
+        c2 = cd2.components.create('c2')
+        c2.definition = part2.identity
+        self.assertIn(c2, doc2.referrers(part2.identity))
+        self.assertNotIn(cd2, doc2.referrers(part2.identity))
+        # References held by objects nested below an added child
+        md = doc.moduleDefinitions.create('md')
+        fc = md.functionalComponents.create('fc')
+        fc.definition = part
+        interaction = sbol.Interaction('i')
+        participation = sbol.Participation('p')
+        interaction.participations.add(participation)
+        md.interactions.add(interaction)
+        participation.participant = fc.identity
+        self.assertIn(participation, doc.referrers(fc.identity))
+
+    def test_find_reference_parsed(self):
+        # Parsed objects refer to their own identities, like objects
+        # built in code
+        for kwargs in ({}, {'streaming': True}, {'lazy': True}):
+            doc = sbol.Document()
+            doc.read(CRISPR_LOCATION, **kwargs)
+            uri = 'http://sbols.org/CRISPR_Example/gRNA_b_gene/1.0.0'
+            cd = doc.componentDefinitions[uri]
+            self.assertIn(cd, doc.find_reference(rdflib.URIRef(uri)))
+            c = cd.components[0]
+            self.assertIn(c, doc.find_reference(rdflib.URIRef(c.identity)))
+
     def test_recursive_add(self):
         # Make sure that when an object gets added to a document
         # all of its child objects also get added.
@@ -417,6 +532,481 @@ class TestDocument(unittest.TestCase):
         self.assertEqual(c1, doc.getCollection('c1'))
         self.assertEqual(c1, doc.getCollection(c1.identity))
 
+    def test_streaming_read(self):
+        # The streaming reader should load the same objects as the
+        # rdflib based reader
+        doc = sbol2.Document(TEST_LOCATION)
+        doc2 = sbol2.Document()
+        doc2.read(TEST_LOCATION, streaming=True)
+        self.assertEqual(len(doc), len(doc2))
+        self.assertEqual(len(doc.componentDefinitions),
+                         len(doc2.componentDefinitions))
+        for obj in doc.SBOLObjects.values():
+            obj2 = doc2.find(obj.identity)
+            self.assertIsNotNone(obj2)
+            self.assertTrue(obj.compare(obj2))
+        uri = 'http://sbols.org/CRISPR_Example/CRISPR_Template/cas9_gRNA_complex/1.0.0'
+        self.assertIsNotNone(doc2.find(uri))
+        # Appending the same file again requires overwrite
+        with self.assertRaises(sbol2.SBOLError):
+            doc2.append(TEST_LOCATION, streaming=True)
+        doc2.append(TEST_LOCATION, overwrite=True, streaming=True)
+        self.assertEqual(len(doc), len(doc2))
+
+    def test_streaming_write(self):
+        doc = sbol2.Document(TEST_LOCATION)
+        doc.appendString(ANNOTATION_XML)
+        sbol2.Config.setOption(sbol2.ConfigOptions.VALIDATE, False)
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            path = os.path.join(tmpdirname, 'streamed.xml')
+            doc.write(path, streaming=True)
+            streamed = rdflib.Graph()
+            streamed.parse(path, format='xml')
+            doc2 = sbol2.Document(path)
+        expected = rdflib.Graph()
+        expected.parse(data=doc.writeString(), format='xml')
+        self.assertEqual(set(expected), set(streamed))
+        self.assertEqual(len(doc), len(doc2))
+        for obj in doc.SBOLObjects.values():
+            self.assertTrue(obj.compare(doc2.find(obj.identity)))
+
+    def test_streaming_write_validate(self):
+        # Validation checks the file that was written instead of
+        # serializing the Document again
+        validate_online = sbol2.Config.getOption(sbol2.ConfigOptions.VALIDATE_ONLINE)
+        try:
+            sbol2.Config.setOption(sbol2.ConfigOptions.VALIDATE, True)
+            sbol2.Config.setOption(sbol2.ConfigOptions.VALIDATE_ONLINE, False)
+            doc = sbol2.Document()
+            doc.moduleDefinitions.create('md')
+            with tempfile.TemporaryDirectory() as tmpdirname:
+                path = os.path.join(tmpdirname, 'streamed.xml')
+                response = dict(valid=True, errors=[])
+                with unittest.mock.patch('sbol2.document.do_validation',
+                                         return_value=response) as do_validation, \
+                        unittest.mock.patch.object(doc, 'writeString') as write_string:
+                    result = doc.write(path, streaming=True)
+                write_string.assert_not_called()
+                with open(path) as fp:
+                    streamed = fp.read()
+            self.assertEqual(result, 'Valid.')
+            json_request = do_validation.call_args[0][0]
+            self.assertEqual(json_request['main_file'], streamed)
+        finally:
+            sbol2.Config.setOption(sbol2.ConfigOptions.VALIDATE_ONLINE, validate_online)
+
+    def test_write_namespaces(self):
+        doc = sbol2.Document()
+        cd = doc.componentDefinitions.create('cd')
+        cd.foo = sbol2.TextProperty(cd, 'http://examples.org/ext#foo',
+                                    '0', '1', None, 'bar')
+        doc.addNamespace('http://examples.org/', 'examples')
+        doc.addNamespace('http://examples.org/ext#', 'ext')
+        doc.addNamespace('http://examples.org/unused#', 'unused')
+        sbol2.Config.setOption(sbol2.ConfigOptions.VALIDATE, False)
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            path = os.path.join(tmpdirname, 'streamed.xml')
+            doc.write(path, streaming=True)
+            with open(path) as fp:
+                streamed = fp.read()
+        for xml in (doc.writeString(), streamed):
+            # The longest matching namespace names the element
+            self.assertIn('<ext:foo>bar</ext:foo>', xml)
+            # Unused namespaces are still declared
+            self.assertIn('xmlns:unused="http://examples.org/unused#"', xml)
+
+    def test_write_canonical(self):
+        # The same objects and values, added in a different order
+        def build(order):
+            doc = sbol2.Document()
+            roles = [sbol2.SO_PROMOTER, sbol2.SO_CDS]
+            for i in order:
+                cd = sbol2.ComponentDefinition('cd%d' % i)
+                cd.roles = roles if order[0] == 0 else roles[::-1]
+                doc.add(cd)
+                for j in order:
+                    cd.sequenceAnnotations.create('sa%d' % j)
+            return doc
+        doc = build([0, 1, 2])
+        doc2 = build([2, 1, 0])
+        self.assertEqual(doc.writeString(canonical=True),
+                         doc2.writeString(canonical=True))
+        expected = rdflib.Graph()
+        expected.parse(data=doc.writeString(), format='xml')
+        canonical = rdflib.Graph()
+        canonical.parse(data=doc.writeString(canonical=True), format='xml')
+        self.assertEqual(set(expected), set(canonical))
+        sbol2.Config.setOption(sbol2.ConfigOptions.VALIDATE, False)
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            files = []
+            for i, d in enumerate((doc, doc2)):
+                path = os.path.join(tmpdirname, 'streamed%d.xml' % i)
+                d.write(path, streaming=True, canonical=True)
+                with open(path, 'rb') as fp:
+                    files.append(fp.read())
+        self.assertEqual(files[0], files[1])
+
+    def test_streaming_read_rdf_forms(self):
+        # The streaming parser reads the RDF/XML forms that rdflib does
+        xml = '''<?xml version="1.0" encoding="utf-8"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:sbol="http://sbols.org/v2#"
+         xmlns:ex="http://examples.org/">
+  <sbol:ComponentDefinition rdf:about="cd/1">
+    <sbol:displayId>cd</sbol:displayId>
+    <sbol:type rdf:resource="http://www.biopax.org/release/biopax-level3.owl#DnaRegion"/>
+    <ex:bag><rdf:Bag><rdf:li>a</rdf:li><rdf:li rdf:resource="#b"/></rdf:Bag></ex:bag>
+    <ex:list rdf:parseType="Collection">
+      <rdf:Description rdf:about="x"/><ex:Y rdf:about="http://examples.org/y"/>
+    </ex:list>
+    <ex:empty rdf:parseType="Collection"/>
+    <ex:note rdf:parseType="Literal">a &amp; <ex:b a="1">b</ex:b> c</ex:note>
+  </sbol:ComponentDefinition>
+</rdf:RDF>
+'''
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            path = os.path.join(tmpdirname, 'forms.xml')
+            with open(path, 'w') as fp:
+                fp.write(xml)
+            expected = rdflib.Graph()
+            expected.parse(path, format='xml')
+            _, type_triples, property_triples = sbol2.SBOL2Serialize.parse_sboll2(path)
+            doc = sbol2.Document()
+            doc.read(path, streaming=True)
+            doc2 = sbol2.Document(path)
+        streamed = rdflib.Graph()
+        for triple in type_triples + property_triples:
+            streamed.add(triple)
+        # XML literals are kept as exclusive canonical XML
+        note = rdflib.URIRef('http://examples.org/note')
+        literal = next(streamed.objects(None, note))
+        self.assertEqual(rdflib.RDF.XMLLiteral, literal.datatype)
+        self.assertEqual('a &amp; <ex:b xmlns:ex="http://examples.org/" a="1">'
+                         'b</ex:b> c', str(literal))
+        expected.remove((None, note, None))
+        streamed.remove((None, note, None))
+        self.assertTrue(rdflib.compare.isomorphic(expected, streamed))
+        # Relative URIs are resolved against the file
+        cd_uri = pathlib.Path(path).absolute().as_uri()
+        cd_uri = cd_uri[:cd_uri.rindex('/') + 1] + 'cd/1'
+        self.assertEqual(cd_uri, doc.componentDefinitions[0].identity)
+        self.assertEqual(len(doc2), len(doc))
+        cd = doc.componentDefinitions[0]
+        cd2 = doc2.componentDefinitions[cd_uri]
+        for predicate in (note, rdflib.URIRef('http://examples.org/empty')):
+            self.assertEqual(cd2.properties[predicate], cd.properties[predicate])
+
+    def test_streaming_read_annotations(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            path = os.path.join(tmpdirname, 'annotation.xml')
+            with open(path, 'w') as fp:
+                fp.write(ANNOTATION_XML)
+            doc = sbol2.Document()
+            doc.read(path, streaming=True)
+        cd = doc.componentDefinitions['http://examples.org/cd/1']
+        info_uri = rdflib.URIRef('http://partsregistry.org/information')
+        info = cd.owned_objects[info_uri][0]
+        sigma_uri = rdflib.URIRef('http://partsregistry.org/sigmafactor')
+        self.assertEqual('//rnap/prokaryote/ecoli/sigma70',
+                         info.getPropertyValue(sigma_uri))
+
+    def test_lazy_read(self):
+        for streaming in (False, True):
+            doc = sbol2.Document()
+            doc.read(TEST_LOCATION, streaming=streaming)
+            doc2 = sbol2.Document()
+            doc2.read(TEST_LOCATION, streaming=streaming, lazy=True)
+            self.assertEqual(0, len(doc2.SBOLObjects))
+            # Looking up a TopLevel builds it and its children only
+            uri = 'http://sbols.org/CRISPR_Example/CRISPR_Template/1.0.0'
+            md = doc2.getModuleDefinition(uri)
+            self.assertEqual(1, len(doc2.SBOLObjects))
+            self.assertTrue(md.compare(doc.getModuleDefinition(uri)))
+            self.assertIs(md, doc2.find(uri))
+            self.assertEqual(len(doc.moduleDefinitions[uri].functionalComponents),
+                             len(md.functionalComponents))
+            # Using a container builds its type
+            self.assertEqual(len(doc.sequences), len(doc2.sequences))
+            self.assertFalse(any(isinstance(obj, sbol2.ComponentDefinition)
+                                 for obj in doc2.SBOLObjects.values()))
+            # Whole Document operations build everything
+            self.assertTrue(doc.compare(doc2))
+            self.assertEqual(len(doc), len(doc2))
+        # Lazily read nested annotations
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            path = os.path.join(tmpdirname, 'annotation.xml')
+            with open(path, 'w') as fp:
+                fp.write(ANNOTATION_XML)
+            doc = sbol2.Document()
+            doc.read(path, lazy=True)
+            # A streaming write builds everything too
+            doc2 = sbol2.Document()
+            doc2.read(path, lazy=True)
+            streamed = os.path.join(tmpdirname, 'streamed.xml')
+            sbol2.Config.setOption(sbol2.ConfigOptions.VALIDATE, False)
+            doc2.write(streamed, streaming=True)
+            self.assertEqual(len(doc2), len(sbol2.Document(streamed)))
+        cd = doc.getComponentDefinition('http://examples.org/cd/1')
+        info_uri = rdflib.URIRef('http://partsregistry.org/information')
+        self.assertIs(cd, cd.owned_objects[info_uri][0].parent)
+
+    def test_append_many(self):
+        with tempfile.TemporaryDirectory() as tmpdirname:
+            path = os.path.join(tmpdirname, 'annotation.xml')
+            with open(path, 'w') as fp:
+                fp.write(ANNOTATION_XML)
+            paths = [TEST_LOCATION, path]
+            expected = sbol2.Document()
+            for p in paths:
+                expected.append(p, streaming=True)
+            for workers in (1, 2):
+                doc = sbol2.Document()
+                doc.append_many(paths, workers=workers)
+                self.assertEqual(len(expected), len(doc))
+                self.assertTrue(expected.compare(doc))
+            # Nothing is added if any object would be overwritten
+            with self.assertRaises(sbol2.SBOLError) as cm:
+                doc.append_many([path])
+            self.assertEqual(cm.exception.error_code(),
+                             sbol2.SBOLErrorCode.DUPLICATE_URI_ERROR)
+            doc = sbol2.Document()
+            with self.assertRaises(sbol2.SBOLError):
+                doc.append_many([path, TEST_LOCATION, path], workers=1)
+            self.assertEqual(0, len(doc))
+            # Clashes between the files and with the Document are
+            # reported together, in order
+            doc.append(TEST_LOCATION)
+            count = len(doc)
+            with self.assertRaises(sbol2.SBOLOverwriteError) as cm:
+                doc.append(TEST_LOCATION)
+            expected_uris = sorted(cm.exception.uris +
+                                   ['http://examples.org/cd/1',
+                                    'http://examples.org/cd/information'])
+            with self.assertRaises(sbol2.SBOLOverwriteError) as cm:
+                doc.append_many([path, TEST_LOCATION, path], workers=1)
+            self.assertEqual(count, len(doc))
+            self.assertEqual(expected_uris, cm.exception.uris)
+            doc = sbol2.Document()
+            # Later files win when overwriting
+            doc.append_many([path, TEST_LOCATION, path], overwrite=True, workers=1)
+            self.assertTrue(expected.compare(doc))
+
+    def test_append_overwrite_error(self):
+        doc = sbol2.Document()
+        doc.append(TEST_LOCATION)
+        count = len(doc)
+        with self.assertRaises(sbol2.SBOLOverwriteError) as cm:
+            doc.append(TEST_LOCATION)
+        self.assertEqual(cm.exception.error_code(),
+                         sbol2.SBOLErrorCode.DUPLICATE_URI_ERROR)
+        # Every collision is reported, not just the first
+        uris = cm.exception.uris
+        self.assertEqual(sorted(uris), uris)
+        for obj in doc:
+            self.assertIn(obj.identity, uris)
+        self.assertEqual(count, len(doc))
+        doc.append(TEST_LOCATION, overwrite=True)
+        self.assertEqual(count, len(doc))
+
+    def test_add_list(self):
+        doc = sbol2.Document()
+        cds = [sbol2.ComponentDefinition('cd%d' % i) for i in range(3)]
+        doc.add_list(cds)
+        self.assertEqual(3, len(doc.componentDefinitions))
+        # A duplicate anywhere in the batch rejects the whole batch
+        batch = [sbol2.ComponentDefinition('cd3'), sbol2.ComponentDefinition('cd3')]
+        with self.assertRaises(sbol2.SBOLError) as cm:
+            doc.add_list(batch)
+        self.assertEqual(cm.exception.error_code(),
+                         sbol2.SBOLErrorCode.SBOL_ERROR_URI_NOT_UNIQUE)
+        self.assertEqual(3, len(doc.componentDefinitions))
+
+    def test_incremental_update_graph(self):
+        # After edits, the incrementally updated graph should match
+        # a graph rebuilt from scratch
+        doc = sbol2.Document()
+        cd = doc.componentDefinitions.create('cd')
+        c1 = cd.components.create('c1')
+        c2 = cd.components.create('c2')
+        seq = doc.sequences.create('seq')
+        doc.update_graph()
+        cd.name = 'renamed'
+        cd.roles = [sbol2.SO_PROMOTER]
+        cd.sequences = [seq.identity]
+        cd.components.remove(c1.identity)
+        c2.definition = cd.identity
+        cd.sequenceAnnotations.create('sa')
+        doc.sequences.remove(seq.identity)
+        doc.moduleDefinitions.create('md')
+        doc.update_graph()
+        incremental = rdflib.Graph()
+        incremental += doc.graph
+        doc.update_graph(rebuild=True)
+        self.assertEqual(sorted(incremental), sorted(doc.graph))
+        self.assertNotIn((rdflib.URIRef(c1.identity), None, None), incremental)
+
+    def test_incremental_update_graph_grandchild(self):
+        # Edits to an object nested inside an added child are tracked
+        doc = sbol2.Document()
+        cd = doc.componentDefinitions.create('cd')
+        sa = sbol2.SequenceAnnotation('sa')
+        r = sbol2.Range('r', 1, 2)
+        sa.locations.add(r)
+        cd.sequenceAnnotations.add(sa)
+        doc.update_graph()
+        r.start = 7
+        doc.update_graph()
+        start = rdflib.URIRef(sbol2.SBOL_START)
+        self.assertEqual([rdflib.Literal(7)],
+                         list(doc.graph.objects(rdflib.URIRef(r.identity), start)))
+
+    def test_diff(self):
+        docs = []
+        for _ in range(2):
+            doc = sbol2.Document()
+            for display_id in ['cd0', 'cd1', 'cd2']:
+                doc.componentDefinitions.create(display_id)
+            docs.append(doc)
+        doc, doc2 = docs
+        self.assertFalse(doc.diff(doc2))
+        self.assertTrue(doc.compare(doc2))
+        cd1 = doc.componentDefinitions['cd1']
+        cd1.components.create('c')
+        doc.componentDefinitions.remove(doc.componentDefinitions['cd0'].identity)
+        doc.sequences.create('seq')
+        diff = doc.diff(doc2)
+        self.assertTrue(diff)
+        self.assertEqual([doc.sequences['seq'].identity], diff.removed)
+        self.assertEqual([doc2.componentDefinitions['cd0'].identity], diff.added)
+        self.assertEqual([cd1.identity], diff.changed)
+        self.assertFalse(doc.compare(doc2))
+
+    def test_apply_patch(self):
+        docs = []
+        for _ in range(3):
+            doc = sbol2.Document()
+            for display_id in ['cd0', 'cd1', 'cd2']:
+                cd = doc.componentDefinitions.create(display_id)
+                cd.components.create('c')
+            docs.append(doc)
+        doc, doc2, doc3 = docs
+        doc2.componentDefinitions['cd0'].components['c'].roles = [sbol2.SO_PROMOTER]
+        doc2.componentDefinitions['cd1'].components.create('c2')
+        doc2.componentDefinitions.remove(doc2.componentDefinitions['cd2'].identity)
+        doc2.sequences.create('seq')
+        doc2.addNamespace('http://example.org/ext#', 'ext')
+        diff = doc.diff(doc2)
+        delta = diff.deltas[doc.componentDefinitions['cd0'].identity]
+        c_delta = delta.changed[sbol2.SBOL_COMPONENTS][0]
+        self.assertEqual([rdflib.URIRef(sbol2.SO_PROMOTER)],
+                         c_delta.properties[sbol2.SBOL_ROLES])
+        delta = diff.deltas[doc.componentDefinitions['cd1'].identity]
+        self.assertEqual(['c2'], [str(d.properties[sbol2.SBOL_DISPLAY_ID][0])
+                                  for d in delta.added[sbol2.SBOL_COMPONENTS]])
+        self.assertTrue(diff.deltas[diff.added[0]].complete)
+        # The diff can be shipped elsewhere and applied there
+        diff = pickle.loads(pickle.dumps(diff))
+        doc3.apply_patch(diff)
+        self.assertTrue(doc3.compare(doc2))
+        self.assertFalse(doc3.diff(doc2))
+        cd = doc3.componentDefinitions['cd1']
+        self.assertEqual(2, len(cd.components))
+        self.assertEqual(cd, doc3.find(cd.components['c2'].identity).parent)
+        self.assertEqual(2, len(doc3.componentDefinitions))
+        # Applying again fails, leaving the Document unchanged
+        with self.assertRaises(sbol2.SBOLError):
+            doc3.apply_patch(diff)
+        self.assertTrue(doc3.compare(doc2))
+
+    def test_compile_all(self):
+        doc = sbol2.Document()
+        parts = []
+        for display_id, elements in [('cd1', 'tt'), ('cd2', 'gg')]:
+            cd = doc.componentDefinitions.create(display_id)
+            cd.sequence = sbol2.Sequence(display_id + '_seq', elements)
+            parts.append(cd)
+        sub = doc.componentDefinitions.create('sub')
+        sub.assemblePrimaryStructure(parts)
+        design = doc.componentDefinitions.create('design')
+        design.assemblePrimaryStructure([sub, parts[0]])
+        expected = {sub.identity: 'ttgg', design.identity: 'ttggtt'}
+        self.assertEqual(expected, doc.compile_all())
+        self.assertEqual(expected, doc.compile_all())
+        parts[1].sequence.elements = 'a'
+        expected = {sub.identity: 'tta', design.identity: 'ttatt'}
+        self.assertEqual(expected, doc.compile_all())
+        self.assertEqual('ttatt', design.sequence.elements)
+
+    def test_assemble_many(self):
+        docs = []
+        for _ in range(2):
+            doc = sbol2.Document()
+            for display_id, elements in [('cd1', 'tt'), ('cd2', 'gg')]:
+                cd = doc.componentDefinitions.create(display_id)
+                cd.sequence = sbol2.Sequence(display_id + '_seq', elements)
+            docs.append(doc)
+        designs = {'design1': ['cd1', 'cd2', 'cd1'], 'design2': ['cd2']}
+        for display_id, parts in designs.items():
+            design = docs[0].componentDefinitions.create(display_id)
+            design.assemblePrimaryStructure(parts)
+        design2 = docs[1].componentDefinitions.create('design2')
+        designs['design2'] = [docs[1].componentDefinitions['cd2']]
+        self.assertEqual({}, docs[1].assemble_many(designs))
+        self.assertTrue(docs[1].compare(docs[0]))
+        self.assertEqual('gg', design2.compile())
+        design1 = docs[1].componentDefinitions['design1']
+        self.assertEqual('ttggtt', design1.compile())
+
+    def test_assemble_many_errors(self):
+        doc = sbol2.Document()
+        cd1 = doc.componentDefinitions.create('cd1')
+        cd1.sequence = sbol2.Sequence('cd1_seq', 'tt')
+        design1 = doc.componentDefinitions.create('design1')
+        errors = doc.assemble_many([(design1, ['cd1', 'cd3']),
+                                    ('design2', ['cd1', 'cd1']),
+                                    ('design3', 'cd1'),
+                                    (sbol2.Document(), ['cd1'])])
+        self.assertEqual([design1, 'design3'], list(errors)[:2])
+        self.assertIsInstance(errors[design1], ValueError)
+        self.assertIsInstance(errors['design3'], TypeError)
+        self.assertEqual(3, len(errors))
+        # The failed designs are left as they were
+        self.assertEqual(0, len(design1.components))
+        self.assertFalse(doc.componentDefinitions.find('design3'))
+        design2 = doc.componentDefinitions['design2']
+        self.assertEqual('tttt', design2.compile())
+        # New designs and parts are taken out again when assembly fails
+        before = doc.writeString(canonical=True)
+
+        def fail(parts):
+            raise ValueError('no assembly')
+        designs = {'design4': [sbol2.ComponentDefinition('cd4')],
+                   'design5': ['cd1', sbol2.ComponentDefinition('cd1')]}
+        errors = doc.assemble_many(designs, assembly_method=fail)
+        self.assertEqual(['design4', 'design5'], list(errors))
+        self.assertIsInstance(errors['design5'], sbol2.SBOLError)
+        self.assertFalse(doc.componentDefinitions.find('design4'))
+        self.assertFalse(doc.componentDefinitions.find('cd4'))
+        self.assertEqual(before, doc.writeString(canonical=True))
+        # An existing design that fails part way through is put back
+        constraints = list(design2.sequenceConstraints)
+        components = list(design2.components)
+
+        def constrain(cd, primary_structure):
+            cd.sequenceConstraints.clear()
+            raise ValueError('no constraints')
+        with unittest.mock.patch.object(sbol2.ComponentDefinition,
+                                        '_constrain_primary_structure',
+                                        constrain):
+            errors = doc.assemble_many({design2: ['cd1']})
+        self.assertIsInstance(errors[design2], ValueError)
+        self.assertEqual(components, list(design2.components))
+        self.assertEqual(constraints, list(design2.sequenceConstraints))
+        self.assertIs(constraints[0],
+                      design2.sequenceConstraints[constraints[0].identity])
+        self.assertEqual(before, doc.writeString(canonical=True))
+        self.assertEqual('tttt', design2.compile())
+
     def test_read_string_clear(self):
         # Test that Document.readString() clears the document
         doc = sbol2.Document()
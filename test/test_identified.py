@@ -141,6 +141,20 @@ class TestIdentified(unittest.TestCase):
         expected = []
         self.assertEqual(cd.wasGeneratedBy, expected)
 
+    def test_update_uri_not_unique(self):
+        # Compliant URIs of children in different properties of the
+        # same parent can collide. The Document catches that.
+        sbol2.Config.setOption(sbol2.ConfigOptions.SBOL_COMPLIANT_URIS, True)
+        sbol2.Config.setOption(sbol2.ConfigOptions.SBOL_TYPED_URIS, False)
+        sbol2.setHomespace('http://examples.org')
+        doc = sbol2.Document()
+        cd = doc.componentDefinitions.create('cd')
+        cd.sequenceAnnotations.create('x')
+        with self.assertRaises(sbol2.SBOLError) as cm:
+            cd.components.create('x')
+        self.assertEqual(cm.exception.error_code(),
+                         sbol2.SBOLErrorCode.SBOL_ERROR_URI_NOT_UNIQUE)
+
 
 class TestCopy(unittest.TestCase):
 
@@ -217,6 +217,34 @@ class TestObject(unittest.TestCase):
         # comparison of modules
         self.assertFalse(md1a.compare(md1b))
 
+    def test_compare_after_change(self):
+        # Test that changing an owned object after a compare is seen
+        # by the next compare of its parents
+        cd1 = sbol2.ComponentDefinition('cd')
+        cd2 = sbol2.ComponentDefinition('cd')
+        c1 = cd1.components.create('c')
+        cd2.components.create('c')
+        self.assertTrue(cd1.compare(cd2))
+        c1.roles = [sbol2.SO_PROMOTER]
+        self.assertFalse(cd1.compare(cd2))
+        cd2.components[0].roles = [sbol2.SO_PROMOTER]
+        self.assertTrue(cd1.compare(cd2))
+        cd1.components.remove(c1.identity)
+        self.assertFalse(cd1.compare(cd2))
+
+    def test_compare_after_rdf_type_change(self):
+        # rdf_type is a plain attribute, but changing it is still seen
+        cd1 = sbol2.ComponentDefinition('cd')
+        cd2 = sbol2.ComponentDefinition('cd')
+        c1 = cd1.components.create('c')
+        cd2.components.create('c')
+        self.assertTrue(cd1.compare(cd2))
+        cd1.rdf_type = 'http://examples.org/ext#Part'
+        self.assertFalse(cd1.compare(cd2))
+        c1.rdf_type = 'http://examples.org/ext#Part'
+        cd2.rdf_type = 'http://examples.org/ext#Part'
+        self.assertFalse(cd1.compare(cd2))
+
     def build_md_tree_3(self, suffix='1'):
         # Build a md->m->measurement tree for comparison
         meter_uri = 'http://www.ontology-of-units-of-measure.org/resource/om-2/metre'
@@ -258,6 +286,70 @@ class TestObject(unittest.TestCase):
         c = sbol.Cut()
         self.assertEqual('0', c.getPropertyValue(sbol.SBOL_AT))
 
+    def test_property_attributes(self):
+        # Property attributes are served by accessors on the class and
+        # look like native values
+        cd = sbol2.ComponentDefinition('cd')
+        self.assertIsInstance(type(cd).__dict__['roles'],
+                              sbol2.object._PropertyAttribute)
+        self.assertIsInstance(cd.__dict__['roles'], sbol2.URIProperty)
+        cd.roles = [sbol2.SO_PROMOTER]
+        self.assertEqual([sbol2.SO_PROMOTER], cd.roles)
+        self.assertEqual([rdflib.URIRef(sbol2.SO_PROMOTER)],
+                         cd.properties[sbol2.SBOL_ROLES])
+        self.assertIsInstance(cd.sequenceAnnotations, sbol2.OwnedObject)
+        # Owned objects with an upper bound of 1 return the object or None
+        sa = cd.sequenceAnnotations.create('sa')
+        self.assertIsNone(sa.component)
+        # A Property added to one instance does not leak to others
+        cd.foo = sbol2.TextProperty(cd, 'http://examples.org/foo', '0', '1')
+        cd.foo = 'bar'
+        self.assertEqual('bar', cd.foo)
+        other = sbol2.ComponentDefinition('other')
+        with self.assertRaises(AttributeError):
+            other.foo
+        other.foo = 'baz'
+        self.assertEqual('baz', other.foo)
+        self.assertEqual('bar', cd.foo)
+
+    def test_from_rdf(self):
+        # Objects built for the parser have empty property stores
+        # apart from identity, and Properties of their own
+        uri = 'http://examples.org/cd/1'
+        cd = sbol2.ComponentDefinition._from_rdf(uri)
+        self.assertEqual(uri, cd.identity)
+        self.assertIsNone(cd.displayId)
+        self.assertIsNone(cd.version)
+        self.assertEqual([], cd.types)
+        self.assertEqual(set(sbol2.ComponentDefinition().properties),
+                         set(cd.properties))
+        self.assertIs(cd, cd.__dict__['roles']._sbol_owner)
+        cd2 = sbol2.ComponentDefinition._from_rdf('http://examples.org/cd2/1')
+        cd.roles = [sbol2.SO_PROMOTER]
+        self.assertEqual([], cd2.roles)
+        self.assertIsNot(cd.owned_objects[sbol2.SBOL_SEQUENCE_ANNOTATIONS],
+                         cd2.owned_objects[sbol2.SBOL_SEQUENCE_ANNOTATIONS])
+
+    def test_from_rdf_extension(self):
+        # Extension classes are constructed, so their own state is not
+        # shared and their constructors run for every object
+        class Tracked(sbol2.TopLevel):
+            created = 0
+
+            def __init__(self, uri='example'):
+                super().__init__('http://examples.org/ext#Tracked', uri)
+                self.notes = []
+                Tracked.created += 1
+
+        uri = 'http://examples.org/tracked/1'
+        obj = Tracked._from_rdf(uri)
+        obj2 = Tracked._from_rdf('http://examples.org/tracked2/1')
+        self.assertEqual(uri, obj.identity)
+        self.assertIsNone(obj.version)
+        self.assertEqual(2, Tracked.created)
+        obj.notes.append('first')
+        self.assertEqual([], obj2.notes)
+
 
 if __name__ == '__main__':
     unittest.main()
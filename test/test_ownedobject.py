@@ -124,6 +124,88 @@ class TestOwnedObject(unittest.TestCase):
         search_string = md.persistentIdentity
         self.assertEqual(md, doc.getModuleDefinition(search_string))
 
+    def test_get_by_persistent_id_exact(self):
+        # Persistent identities are matched whole, not as prefixes
+        sbol2.Config.setOption(sbol2.ConfigOptions.SBOL_TYPED_URIS, False)
+        doc = sbol2.Document()
+        cd = doc.componentDefinitions.create('cd12')
+        self.assertEqual(cd, doc.componentDefinitions[cd.persistentIdentity])
+        self.assertFalse(doc.componentDefinitions.find(cd.persistentIdentity[:-1]))
+        with self.assertRaises(sbol2.SBOLError) as cm:
+            doc.componentDefinitions.get_uri(cd.persistentIdentity[:-1])
+        self.assertEqual(cm.exception.error_code(),
+                         sbol2.SBOLErrorCode.NOT_FOUND_ERROR)
+
+    def test_lookup_index(self):
+        # Lookups must follow adds, removes and identity changes
+        doc = sbol2.Document()
+        cd1 = doc.componentDefinitions.create('cd1')
+        cd2 = sbol2.ComponentDefinition('cd1', version='2')
+        doc.addComponentDefinition(cd2)
+        self.assertEqual(cd2, doc.componentDefinitions[cd1.persistentIdentity])
+        self.assertEqual(cd2, doc.componentDefinitions['cd1'])
+        self.assertEqual(cd1, doc.componentDefinitions[cd1.identity])
+        doc.componentDefinitions.remove(cd2.identity)
+        self.assertEqual(cd1, doc.componentDefinitions['cd1'])
+        sa = cd1.sequenceAnnotations.create('sa')
+        new_identity = 'http://examples.org/renamed/1'
+        sa.identity = new_identity
+        self.assertEqual(sa, cd1.sequenceAnnotations[new_identity])
+        self.assertFalse(cd1.sequenceAnnotations.find(sa.persistentIdentity +
+                                                      '/1'))
+
+    def test_lookup_index_rewritten(self):
+        # Lookups must follow objects that are rewritten in place by
+        # apply_patch and by overwriting appends
+        doc = sbol2.Document()
+        cd = doc.componentDefinitions.create('cd')
+        old_pid = cd.persistentIdentity
+        self.assertEqual(cd, doc.componentDefinitions[old_pid])
+        doc2 = sbol2.Document()
+        doc2.readString(doc.writeString())
+        new_pid = 'http://examples.org/other'
+        doc2.componentDefinitions['cd'].persistentIdentity = new_pid
+        doc.apply_patch(doc.diff(doc2))
+        self.assertEqual(cd, doc.componentDefinitions[new_pid])
+        self.assertFalse(doc.componentDefinitions.find(old_pid))
+        doc2.componentDefinitions['cd'].persistentIdentity = old_pid
+        doc.appendString(doc2.writeString(), overwrite=True)
+        self.assertEqual(cd, doc.componentDefinitions[old_pid])
+        self.assertFalse(doc.componentDefinitions.find(new_pid))
+
+    def test_add_many(self):
+        cd = sbol2.ComponentDefinition('cd')
+        sas = [sbol2.SequenceAnnotation('sa%d' % i) for i in range(3)]
+        cd.sequenceAnnotations.add_many(sas)
+        self.assertEqual(sas, list(cd.sequenceAnnotations))
+        self.assertEqual(sas[1], cd.sequenceAnnotations['sa1'])
+        # A duplicate anywhere in the batch rejects the whole batch
+        batch = [sbol2.SequenceAnnotation('sa3'), sbol2.SequenceAnnotation('sa0')]
+        with self.assertRaises(sbol2.SBOLError) as cm:
+            cd.sequenceAnnotations.add_many(batch)
+        self.assertEqual(cm.exception.error_code(),
+                         sbol2.SBOLErrorCode.SBOL_ERROR_URI_NOT_UNIQUE)
+        self.assertEqual(3, len(cd.sequenceAnnotations))
+
+    def test_add_many_failed_batch(self):
+        # A failed batch leaves the objects as they were
+        doc = sbol2.Document()
+        cd = doc.componentDefinitions.create('cd')
+        cd.sequenceAnnotations.create('sa0')
+        sa1 = sbol2.SequenceAnnotation('sa1')
+        r = sa1.locations.createRange('r')
+        before = [(obj.identity, obj.persistentIdentity, obj.parent, obj.doc)
+                  for obj in (sa1, r)]
+        with self.assertRaises(sbol2.SBOLError):
+            cd.sequenceAnnotations.add_many([sa1,
+                                             sbol2.SequenceAnnotation('sa0')])
+        after = [(obj.identity, obj.persistentIdentity, obj.parent, obj.doc)
+                 for obj in (sa1, r)]
+        self.assertEqual(before, after)
+        self.assertIsNone(doc.find(cd.persistentIdentity + '/sa1/1'))
+        cd.sequenceAnnotations.add(sa1)
+        self.assertEqual(doc, r.doc)
+
     def test_remove_by_display_id(self):
         doc = sbol2.Document()
         cd = doc.componentDefinitions.create('cd1')
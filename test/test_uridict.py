@@ -0,0 +1,39 @@
+import unittest
+
+import rdflib
+
+from sbol2.uridict import URIDict
+
+
+class TestURIDict(unittest.TestCase):
+
+    def test_uriref_keys(self):
+        # URIRef and str keys with the same characters are the same key
+        uri = 'http://examples.org/thing'
+        d = URIDict()
+        d[rdflib.URIRef(uri)] = 1
+        self.assertIn(uri, d)
+        self.assertIn(rdflib.URIRef(uri), d)
+        self.assertEqual(1, d[uri])
+        self.assertEqual([uri], list(d))
+        self.assertIs(type(list(d)[0]), str)
+        self.assertEqual(1, d.get(rdflib.URIRef(uri)))
+        self.assertEqual(1, d.setdefault(rdflib.URIRef(uri), 2))
+        self.assertEqual(1, d.pop(rdflib.URIRef(uri)))
+        self.assertNotIn(uri, d)
+        self.assertIsNone(d.pop(rdflib.URIRef(uri), None))
+
+    def test_update(self):
+        uri = rdflib.URIRef('http://examples.org/thing')
+        d = URIDict({uri: 1})
+        d.update({uri: 2})
+        self.assertEqual({'http://examples.org/thing': 2}, d)
+        copy = d.copy()
+        self.assertIsInstance(copy, URIDict)
+        self.assertEqual(2, copy[uri])
+        del d[uri]
+        self.assertEqual(0, len(d))
+
+
+if __name__ == '__main__':
+    unittest.main()